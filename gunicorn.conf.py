@@ -1,5 +1,15 @@
 """Gunicorn configuration."""
 
+import os
+
+# Threaded workers are opt-in - each thread keeps its own database and Ceph connections (see adapters.py), so the
+# number of connections opened by the service grows with workers * threads and has to fit limits of the database.
+# Clients waiting for analyses to finish (long-poll) occupy a thread each and share one analysis watcher per worker;
+# with sync workers they are responded with the current state right away (see THOTH_USER_API_WATCH_CLIENTS_MAX).
+if int(os.getenv("THOTH_USER_API_THREADED_WORKERS", 0)):
+    worker_class = "gthread"
+    threads = int(os.getenv("THOTH_USER_API_WORKER_THREADS", 16))
+
 accesslog = "-"
 
 # Handcrafted to be JSON compatible:
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests of ingestion of build logs streamed in request body."""
+
+import hashlib
+import io
+import json
+import tracemalloc
+from typing import Any
+from typing import Callable
+from typing import Dict
+
+import pytest
+from thoth.storages import BuildLogsStore
+
+from thoth.user_api.buildlog import store_build_log_stream
+from thoth.user_api.digest import compute_digest
+from thoth.user_api.exceptions import BuildLogTooLargeError
+
+_LOGS = (
+    b"Step 1/3 : FROM registry.access.redhat.com/ubi8/python-38\n",
+    'Collecting žluťoučký-kůň==1.0 😀\n\t"quoted" \\ back\\slash \x00\x1f\x7f\n'.encode(),
+    # Not valid UTF-8: a lone continuation byte, a truncated sequence and a byte never used in UTF-8.
+    b"invalid \x80 utf-8 \xe2\x82 sequences \xff\n",
+    # Truncated sequence at the very end of the log.
+    "trailing ř".encode()[:-1],
+)
+
+
+class _GeneratedStream:
+    """A request body of the given size generated while read, never held in memory as a whole."""
+
+    _LINE = "Installing collected packages: numpy, žluťoučký-kůň\n".encode()
+
+    def __init__(self, size: int) -> None:
+        """Initialize stream of the given size in bytes."""
+        self.remaining = size
+
+    def read(self, size: int) -> bytes:
+        """Read at most size bytes."""
+        size = min(size, self.remaining)
+        self.remaining -= size
+        return (self._LINE * (size // len(self._LINE) + 1))[:size]
+
+
+class TestBuildLog:
+    """Test storing build logs streamed in chunks."""
+
+    @pytest.fixture
+    def adapter(self, adapters: Callable[[Any], Any]) -> Any:
+        """Get build logs adapter keeping documents in memory."""
+        return adapters(BuildLogsStore)
+
+    @pytest.mark.parametrize("log", _LOGS)
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+    def test_store_build_log_stream(self, adapter: Any, log: bytes, chunk_size: int) -> None:
+        """Test streamed build log is stored the same way as the one submitted in the request body."""
+        document: Dict[str, Any] = {"log": log.decode("utf-8", errors="replace")}
+        document_id, cached_document_id = store_build_log_stream(io.BytesIO(log), chunk_size=chunk_size)
+        stored = adapter.ceph.objects.pop(document_id)
+
+        assert document_id == adapter.store_document(document)
+        assert stored == adapter.ceph.objects[document_id]
+        assert cached_document_id == compute_digest(document)
+        assert cached_document_id == hashlib.sha256(json.dumps(document, sort_keys=True).encode()).hexdigest()
+
+    def test_store_build_log_stream_empty(self, adapter: Any) -> None:
+        """Test empty build log is not stored."""
+        assert store_build_log_stream(io.BytesIO(b"")) is None
+        assert not adapter.ceph.objects
+
+    def test_store_build_log_stream_too_large(self, adapter: Any) -> None:
+        """Test build log exceeding the allowed size is rejected and not stored."""
+        with pytest.raises(BuildLogTooLargeError):
+            store_build_log_stream(io.BytesIO(b"x" * 1025), max_length=1024, chunk_size=100)
+
+        assert not adapter.ceph.objects
+
+    def test_store_build_log_stream_memory(self, adapter: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test memory used when storing a large build log does not depend on its size."""
+        stored = {}
+
+        def store_file(document_path: str, document_id: str) -> Dict[str, Any]:
+            # Hash the uploaded file in chunks, the same way as it would be uploaded.
+            hasher = hashlib.sha256()
+            with open(document_path, "rb") as document_file:
+                for chunk in iter(lambda: document_file.read(64 * 1024), b""):
+                    hasher.update(chunk)
+            stored[document_id] = hasher.hexdigest()
+            return {}
+
+        monkeypatch.setattr(adapter.ceph, "store_file", store_file)
+        size = 32 * 1024 * 1024
+        chunk_size = 64 * 1024
+
+        tracemalloc.start()
+        try:
+            document_id, _ = store_build_log_stream(_GeneratedStream(size), max_length=size, chunk_size=chunk_size)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # A chunk read, decoded and escaped (at most 6 bytes per character) is held at once.
+        assert peak < 16 * chunk_size
+        assert stored == {document_id: document_id[len("buildlog-") :]}
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Configuration shared by all the tests."""
+
+import os
+import threading
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Type
+
+import pytest
+from thoth.storages import CephStore
+from thoth.storages.exceptions import NotFoundError
+
+# Configuration of the service and of storage adapters requires these to be set, values are not used by the tests.
+for _name in (
+    "THOTH_USER_API_APP_SECRET_KEY",
+    "THOTH_MIDDLETIER_NAMESPACE",
+    "THOTH_BACKEND_NAMESPACE",
+    "THOTH_DEPLOYMENT_NAME",
+    "THOTH_HOST",
+    "THOTH_CEPH_BUCKET_PREFIX",
+    "THOTH_S3_ENDPOINT_URL",
+    "THOTH_CEPH_KEY_ID",
+    "THOTH_CEPH_SECRET_KEY",
+    "THOTH_CEPH_BUCKET",
+):
+    os.environ.setdefault(_name, "test")
+
+from thoth.user_api.adapters import ADAPTERS  # noqa: E402
+
+
+class InMemoryCephStore(CephStore):
+    """Ceph adapter keeping objects in memory, objects are shared by all the threads."""
+
+    def __init__(self, prefix: str) -> None:
+        """Initialize an empty store."""
+        super().__init__(prefix)
+        self.objects: Dict[str, bytes] = {}
+
+    def connect(self) -> None:
+        """Connect nothing, objects are kept in memory."""
+
+    def is_connected(self) -> bool:
+        """Report the store as connected."""
+        return True
+
+    def store_blob(self, blob: bytes, object_key: str) -> Dict[str, Any]:
+        """Store a blob in memory."""
+        self.objects[object_key] = blob
+        return {}
+
+    def store_file(self, document_path: str, document_id: str) -> Dict[str, Any]:
+        """Store content of a file in memory."""
+        with open(document_path, "rb") as document_file:
+            return self.store_blob(document_file.read(), document_id)
+
+    def retrieve_blob(self, object_key: str) -> bytes:
+        """Retrieve a blob stored in memory."""
+        try:
+            return self.objects[object_key]
+        except KeyError:
+            raise NotFoundError(f"Failed to retrieve object, object {object_key!r} does not exist") from None
+
+    def delete(self, object_key: str) -> None:
+        """Delete the given object, if present."""
+        self.objects.pop(object_key, None)
+
+
+@pytest.fixture
+def adapters(monkeypatch: pytest.MonkeyPatch) -> Callable[[Type[Any]], Any]:
+    """Hand out storage adapters keeping objects in memory, one instance per adapter class for all the threads."""
+    instances: Dict[Type[Any], Any] = {}
+    lock = threading.Lock()
+
+    def get(adapter_class: Type[Any]) -> Any:
+        with lock:
+            adapter = instances.get(adapter_class)
+            if adapter is None:
+                adapter = instances[adapter_class] = adapter_class()
+                adapter.ceph = InMemoryCephStore(adapter.prefix)
+
+        return adapter
+
+    monkeypatch.setattr(ADAPTERS, "get", get)
+    return get
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests of digests of request parameters used as cache keys."""
+
+import hashlib
+import json
+import random
+import tracemalloc
+from typing import Any
+
+import pytest
+
+from thoth.user_api.digest import compute_digest
+
+from .serialization_test import _random_document
+
+
+def _expected_digest(parameters: Any) -> str:
+    """Compute digest the way it was computed before, cache records are keyed by it."""
+    return hashlib.sha256(json.dumps(parameters, sort_keys=True).encode()).hexdigest()
+
+
+class TestDigest:
+    """Test digests of request parameters."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_compute_digest(self, seed: int) -> None:
+        """Test digests equal SHA-256 of parameters encoded by json.dumps with sorted keys."""
+        rng = random.Random(seed)
+        for _ in range(100):
+            parameters = _random_document(rng)
+            assert compute_digest(parameters) == _expected_digest(parameters)
+            assert compute_digest({"input": parameters}) == _expected_digest({"input": parameters})
+
+    @pytest.mark.parametrize(
+        "parameters",
+        [
+            {},
+            [],
+            "",
+            None,
+            {"b": (1, 2), "a": [{"y": 1, "x": 2}]},
+            {1: "non-string key", 2: None},
+            {"log": "x" * (3 * 1024 * 1024 + 7)},
+            # Characters escaped to multiple characters, across the boundaries of chunks hashed.
+            {"log": 'žluťoučký kůň 😀 \n"\\' * 300_000, "debug": False},
+            {"nested": {"log": "😀" * (1024 * 1024 + 1)}},
+            ["😀" * (1024 * 1024 + 1)],
+        ],
+    )
+    def test_compute_digest_parameters(self, parameters: Any) -> None:
+        """Test digests of parameters hashed in parts."""
+        assert compute_digest(parameters) == _expected_digest(parameters)
+
+    def test_compute_digest_memory(self) -> None:
+        """Test the encoding of a large build log is hashed in parts, not built as a whole."""
+        build_log = {"log": "Installing collected packages: numpy, žluťoučký-kůň\n" * 500_000}
+        size = len(json.dumps(build_log, sort_keys=True))
+
+        tracemalloc.start()
+        try:
+            compute_digest(build_log)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        # Encoding the whole build log would take twice its size (string and bytes).
+        assert peak < size // 8
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests of the client talking to container image registries directly."""
+
+import base64
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pytest
+
+from thoth.user_api.exceptions import ImageAuthenticationRequiredError
+from thoth.user_api.exceptions import ImageError
+from thoth.user_api.exceptions import ImageInvalidCredentialsError
+from thoth.user_api.exceptions import ImageInvalidReferenceFormatError
+from thoth.user_api.exceptions import ImageManifestUnknownError
+from thoth.user_api.registry import _TOKEN_CACHE
+from thoth.user_api.registry import parse_image_reference
+from thoth.user_api.registry import registry_inspect
+
+_REPOSITORY = "thoth-station/s2i-thoth-ubi8-py38"
+_TOKEN = "registry-token"
+_USER = "thoth"
+_PASSWORD = "secret"
+
+
+def _digest(document: Dict[str, Any]) -> str:
+    """Compute digest of a document served by the registry."""
+    return "sha256:" + hashlib.sha256(json.dumps(document).encode()).hexdigest()
+
+
+_CONFIG = {
+    "architecture": "amd64",
+    "os": "linux",
+    "created": "2021-05-04T08:00:00Z",
+    "docker_version": "19.03",
+    "config": {"Labels": {"name": "s2i-thoth-ubi8-py38"}, "Env": ["PATH=/usr/bin"]},
+}
+_MANIFEST = {
+    "schemaVersion": 2,
+    "mediaType": "application/vnd.docker.distribution.manifest.v2+json",
+    "config": {"digest": _digest(_CONFIG)},
+    "layers": [{"digest": "sha256:" + "1" * 64}, {"digest": "sha256:" + "2" * 64}],
+}
+_MANIFEST_ARM = dict(_MANIFEST, layers=[{"digest": "sha256:" + "3" * 64}])
+_MANIFEST_LIST = {
+    "schemaVersion": 2,
+    "mediaType": "application/vnd.docker.distribution.manifest.list.v2+json",
+    "manifests": [
+        {"digest": _digest(_MANIFEST_ARM), "platform": {"architecture": "arm64", "os": "linux"}},
+        {"digest": _digest(_MANIFEST), "platform": {"architecture": "amd64", "os": "linux"}},
+    ],
+}
+_MANIFEST_LIST_ARM = dict(_MANIFEST_LIST, manifests=_MANIFEST_LIST["manifests"][:1])
+_MANIFESTS = {
+    "v0.1.0": _MANIFEST,
+    "multi": _MANIFEST_LIST,
+    "arm-only": _MANIFEST_LIST_ARM,
+    _digest(_MANIFEST): _MANIFEST,
+    _digest(_MANIFEST_ARM): _MANIFEST_ARM,
+}
+_TAGS = ["v0.1.0", "multi", "arm-only"]
+
+
+class _Registry:
+    """State and configuration of a stub registry."""
+
+    def __init__(self) -> None:
+        """Initialize registry using bearer token authentication, anonymous pulls are allowed."""
+        # "bearer", "basic" or None.
+        self.auth: Optional[str] = "bearer"
+        self.credentials_required = False
+        self.fail = False
+        self.requests: List[Tuple[str, Optional[str]]] = []
+        self.url = ""
+
+
+def _handler(state: _Registry) -> Any:
+    """Create a request handler serving the given registry."""
+
+    class Handler(BaseHTTPRequestHandler):
+        """Serve Docker Registry v2 API requests."""
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            """Do not log requests."""
+
+        def _send(self, status: int, body: Any = None, headers: Optional[Dict[str, str]] = None) -> None:
+            """Send a JSON response."""
+            content = json.dumps(body).encode() if body is not None else b""
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def _basic_credentials(self) -> Optional[Tuple[str, str]]:
+            """Get credentials sent using basic authentication."""
+            authorization = self.headers.get("Authorization", "")
+            if not authorization.startswith("Basic "):
+                return None
+            user, _, password = base64.b64decode(authorization[len("Basic ") :]).decode().partition(":")
+            return user, password
+
+        def _authorized(self) -> bool:
+            """Check the request is authorized, send challenge if not."""
+            if state.auth == "bearer":
+                if self.headers.get("Authorization") == f"Bearer {_TOKEN}":
+                    return True
+                challenge = f'Bearer realm="{state.url}/token",service="registry"'
+            elif state.auth == "basic":
+                if self._basic_credentials() == (_USER, _PASSWORD):
+                    return True
+                challenge = 'Basic realm="registry"'
+            else:
+                return True
+
+            self._send(401, {"errors": [{"code": "UNAUTHORIZED"}]}, {"WWW-Authenticate": challenge})
+            return False
+
+        def do_GET(self) -> None:  # noqa: N802
+            """Serve a GET request."""
+            state.requests.append((self.path, self.headers.get("Authorization")))
+            path, _, query = self.path.partition("?")
+            if path == "/token":
+                credentials = self._basic_credentials()
+                if credentials is not None and credentials != (_USER, _PASSWORD):
+                    return self._send(401)
+                if credentials is None and state.credentials_required:
+                    return self._send(401)
+                if f"scope=repository%3A{_REPOSITORY.replace('/', '%2F')}%3Apull" not in query:
+                    return self._send(400)
+                return self._send(200, {"token": _TOKEN, "expires_in": 300})
+
+            if not self._authorized():
+                return None
+
+            if state.fail:
+                return self._send(500, {"errors": [{"code": "UNKNOWN"}]})
+
+            prefix = f"/v2/{_REPOSITORY}/"
+            if not path.startswith(prefix):
+                return self._send(404, {"errors": [{"code": "NAME_UNKNOWN"}]})
+
+            resource = path[len(prefix) :]
+            if resource.startswith("manifests/"):
+                manifest = _MANIFESTS.get(resource[len("manifests/") :])
+                if manifest is None:
+                    return self._send(404, {"errors": [{"code": "MANIFEST_UNKNOWN"}]})
+                return self._send(200, manifest, {"Docker-Content-Digest": _digest(manifest)})
+
+            if resource == f"blobs/{_digest(_CONFIG)}":
+                return self._send(200, _CONFIG)
+
+            if resource == "tags/list":
+                if query == "last=multi":
+                    return self._send(200, {"name": _REPOSITORY, "tags": _TAGS[2:]})
+                return self._send(
+                    200,
+                    {"name": _REPOSITORY, "tags": _TAGS[:2]},
+                    {"Link": f'</v2/{_REPOSITORY}/tags/list?last=multi>; rel="next"'},
+                )
+
+            return self._send(404, {"errors": [{"code": "BLOB_UNKNOWN"}]})
+
+    return Handler
+
+
+@pytest.fixture
+def stub_registry() -> Iterator[_Registry]:
+    """Run a stub registry listening on localhost, plain HTTP is used."""
+    state = _Registry()
+    server = ThreadingHTTPServer(("localhost", 0), _handler(state))
+    state.url = f"http://localhost:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    _TOKEN_CACHE.clear()
+    try:
+        yield state
+    finally:
+        server.shutdown()
+        server.server_close()
+        _TOKEN_CACHE.clear()
+
+
+def _image(state: _Registry, reference: str) -> str:
+    """Get image name in the stub registry."""
+    separator = "@" if reference.startswith("sha256:") else ":"
+    return f"{state.url[len('http://'):]}/{_REPOSITORY}{separator}{reference}"
+
+
+class TestRegistry:
+    """Test inspection of images by talking to the registry API directly."""
+
+    @pytest.mark.parametrize(
+        "image_name,expected",
+        [
+            ("fedora", ("docker.io", "library/fedora", "latest")),
+            ("docker://fedora:33", ("docker.io", "library/fedora", "33")),
+            ("quay.io/thoth-station/s2i:v0.1.0", ("quay.io", "thoth-station/s2i", "v0.1.0")),
+            ("localhost:5000/s2i", ("localhost:5000", "s2i", "latest")),
+            ("quay.io/s2i@sha256:" + "a" * 64, ("quay.io", "s2i", "sha256:" + "a" * 64)),
+        ],
+    )
+    def test_parse_image_reference(self, image_name: str, expected: Tuple[str, str, str]) -> None:
+        """Test parsing image references."""
+        assert parse_image_reference(image_name) == expected
+
+    @pytest.mark.parametrize("image_name", ["", " fedora", "Fedora", "fedora:", "quay.io/s2i@sha256", "a:b:c"])
+    def test_parse_image_reference_invalid(self, image_name: str) -> None:
+        """Test invalid image references are rejected."""
+        with pytest.raises(ImageInvalidReferenceFormatError):
+            parse_image_reference(image_name)
+
+    def test_inspect_token_auth(self, stub_registry: _Registry) -> None:
+        """Test inspection using a bearer token obtained anonymously, output matches the one of skopeo."""
+        result = registry_inspect(_image(stub_registry, "v0.1.0"), verify_tls=False)
+
+        assert result == {
+            "Name": f"{stub_registry.url[len('http://'):]}/{_REPOSITORY}",
+            "Tag": "v0.1.0",
+            "Digest": _digest(_MANIFEST),
+            "RepoTags": _TAGS,
+            "Created": _CONFIG["created"],
+            "DockerVersion": _CONFIG["docker_version"],
+            "Labels": _CONFIG["config"]["Labels"],
+            "Architecture": "amd64",
+            "Os": "linux",
+            "Layers": ["sha256:" + "1" * 64, "sha256:" + "2" * 64],
+            "Env": _CONFIG["config"]["Env"],
+        }
+        assert [path for path, _ in stub_registry.requests].count(
+            f"/token?service=registry&scope=repository%3A{_REPOSITORY.replace('/', '%2F')}%3Apull"
+        ) == 1
+
+    def test_inspect_token_cached(self, stub_registry: _Registry) -> None:
+        """Test bearer token is reused by subsequent inspections."""
+        registry_inspect(_image(stub_registry, "v0.1.0"), verify_tls=False)
+        stub_registry.requests.clear()
+        registry_inspect(_image(stub_registry, "v0.1.0"), verify_tls=False)
+
+        assert not any(path.startswith("/token") for path, _ in stub_registry.requests)
+        # Only the first request probing for the authentication challenge is sent without the token.
+        assert [authorization for _, authorization in stub_registry.requests][1:] == [f"Bearer {_TOKEN}"] * (
+            len(stub_registry.requests) - 1
+        )
+
+    def test_inspect_token_auth_credentials(self, stub_registry: _Registry) -> None:
+        """Test credentials are sent to the token service when requested."""
+        stub_registry.credentials_required = True
+        with pytest.raises(ImageAuthenticationRequiredError):
+            registry_inspect(_image(stub_registry, "v0.1.0"), verify_tls=False)
+
+        with pytest.raises(ImageInvalidCredentialsError):
+            registry_inspect(
+                _image(stub_registry, "v0.1.0"), registry_user=_USER, registry_password="wrong", verify_tls=False
+            )
+
+        result = registry_inspect(
+            _image(stub_registry, "v0.1.0"), registry_user=_USER, registry_password=_PASSWORD, verify_tls=False
+        )
+        assert result["Digest"] == _digest(_MANIFEST)
+
+    def test_inspect_basic_auth(self, stub_registry: _Registry) -> None:
+        """Test inspection of a registry using basic authentication."""
+        stub_registry.auth = "basic"
+        with pytest.raises(ImageAuthenticationRequiredError):
+            registry_inspect(_image(stub_registry, "v0.1.0"), verify_tls=False)
+
+        with pytest.raises(ImageInvalidCredentialsError):
+            registry_inspect(
+                _image(stub_registry, "v0.1.0"), registry_user=_USER, registry_password="wrong", verify_tls=False
+            )
+
+        result = registry_inspect(
+            _image(stub_registry, "v0.1.0"), registry_user=_USER, registry_password=_PASSWORD, verify_tls=False
+        )
+        assert result["Digest"] == _digest(_MANIFEST)
+
+    def test_inspect_manifest_list(self, stub_registry: _Registry) -> None:
+        """Test linux/amd64 manifest is selected from a manifest list, digest is the one of the manifest list."""
+        result = registry_inspect(_image(stub_registry, "multi"), verify_tls=False)
+
+        assert result["Tag"] == "multi"
+        assert result["Digest"] == _digest(_MANIFEST_LIST)
+        assert result["Layers"] == ["sha256:" + "1" * 64, "sha256:" + "2" * 64]
+
+    def test_inspect_digest(self, stub_registry: _Registry) -> None:
+        """Test inspection of an image referenced by digest."""
+        result = registry_inspect(_image(stub_registry, _digest(_MANIFEST)), verify_tls=False)
+
+        assert result["Tag"] is None
+        assert result["Digest"] == _digest(_MANIFEST)
+
+    def test_inspect_manifest_list_no_platform(self, stub_registry: _Registry) -> None:
+        """Test manifest lists without linux/amd64 manifest are reported as unknown."""
+        with pytest.raises(ImageManifestUnknownError):
+            registry_inspect(_image(stub_registry, "arm-only"), verify_tls=False)
+
+    def test_inspect_manifest_unknown(self, stub_registry: _Registry) -> None:
+        """Test unknown tags are reported."""
+        with pytest.raises(ImageManifestUnknownError):
+            registry_inspect(_image(stub_registry, "v9.9.9"), verify_tls=False)
+
+    def test_inspect_server_error(self, stub_registry: _Registry) -> None:
+        """Test registry errors are reported as image errors."""
+        stub_registry.fail = True
+        with pytest.raises(ImageError) as exc_info:
+            registry_inspect(_image(stub_registry, "v0.1.0"), verify_tls=False)
+
+        assert type(exc_info.value) is ImageError
+
+    def test_inspect_tls_verification(self, stub_registry: _Registry) -> None:
+        """Test plain HTTP is not used if TLS verification is turned on."""
+        with pytest.raises(ImageError):
+            registry_inspect(_image(stub_registry, "v0.1.0"), verify_tls=True)
+
+        assert not stub_registry.requests
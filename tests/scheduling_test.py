@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests of deduplication of identical requests scheduling workflows."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import pytest
+from thoth.storages import AdvisersCacheStore
+
+from thoth.user_api.cache import timestamp_now
+from thoth.user_api.scheduling import ScheduleOnce
+
+_KEY = "0123456789abcdef"
+_LOCK_KEY = _KEY + ".lock"
+
+
+class _Scheduler:
+    """A callable scheduling a workflow, the cache record is stored the same way as by API handlers."""
+
+    def __init__(self, adapter: Any, *, fail: bool = False) -> None:
+        """Initialize scheduler storing records using the given adapter, optionally failing instead."""
+        self.adapter = adapter
+        self.fail = fail
+        self.calls = 0
+        self.started = threading.Event()
+        self.proceed = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self) -> Tuple[Dict[str, Any], int]:
+        """Schedule a workflow once allowed to proceed."""
+        with self._lock:
+            self.calls += 1
+            analysis_id = f"adviser-{self.calls}"
+
+        self.started.set()
+        assert self.proceed.wait(timeout=10)
+        if self.fail:
+            raise RuntimeError("Failed to schedule")
+
+        self.adapter.store_document_record(_KEY, {"analysis_id": analysis_id, "timestamp": timestamp_now()})
+        return {"analysis_id": analysis_id}, 202
+
+
+def _run_concurrently(functions: List[Callable[[], Any]]) -> List[Any]:
+    """Run the given functions concurrently, return their results or exceptions raised."""
+
+    def call(function: Callable[[], Any]) -> Any:
+        try:
+            return function()
+        except Exception as exc:
+            return exc
+
+    with ThreadPoolExecutor(max_workers=len(functions)) as executor:
+        return list(executor.map(call, functions))
+
+
+class TestScheduleOnce:
+    """Test scheduling workflows at most once for concurrent identical requests."""
+
+    @pytest.fixture
+    def adapter(self, adapters: Callable[[Any], Any]) -> Any:
+        """Get cache store adapter keeping records in memory."""
+        return adapters(AdvisersCacheStore)
+
+    @staticmethod
+    def _release_when_waiting(scheduler: _Scheduler, delay: float = 0.2) -> threading.Thread:
+        """Let the scheduler proceed once it was called and other callers had time to start waiting."""
+
+        def release() -> None:
+            assert scheduler.started.wait(timeout=10)
+            time.sleep(delay)
+            scheduler.proceed.set()
+
+        thread = threading.Thread(target=release)
+        thread.start()
+        return thread
+
+    def test_run_concurrent_single_worker(self, adapter: Any) -> None:
+        """Test concurrent identical requests in one worker schedule a single workflow."""
+        schedule_once = ScheduleOnce(AdvisersCacheStore)
+        scheduler = _Scheduler(adapter)
+        releaser = self._release_when_waiting(scheduler)
+
+        results = _run_concurrently([lambda: schedule_once.run(_KEY, scheduler)] * 8)
+        releaser.join()
+
+        assert scheduler.calls == 1
+        assert [response for response, _, _ in results] == [{"analysis_id": "adviser-1"}] * 8
+        assert [status_code for _, status_code, _ in results] == [202] * 8
+        assert sorted(reused for _, _, reused in results) == [False] + [True] * 7
+        assert schedule_once.coalesced_count == 7
+        assert _LOCK_KEY not in adapter.ceph.objects
+
+    def test_run_concurrent_workers(self, adapter: Any) -> None:
+        """Test concurrent identical requests in different workers schedule a single workflow."""
+        workers = [ScheduleOnce(AdvisersCacheStore, poll_interval=0.01) for _ in range(4)]
+        scheduler = _Scheduler(adapter)
+        releaser = self._release_when_waiting(scheduler)
+
+        leader = threading.Thread(target=workers[0].run, args=(_KEY, scheduler))
+        leader.start()
+        assert scheduler.started.wait(timeout=10)
+        # Workers started once the lock is held.
+        results = _run_concurrently([lambda w=w: w.run(_KEY, scheduler) for w in workers[1:]])
+        leader.join()
+        releaser.join()
+
+        assert scheduler.calls == 1
+        assert results == [({"analysis_id": "adviser-1"}, 202, True)] * 3
+        assert _LOCK_KEY not in adapter.ceph.objects
+
+    def test_run_leader_exception(self, adapter: Any) -> None:
+        """Test exception raised when scheduling is propagated to callers waiting for the leader."""
+        schedule_once = ScheduleOnce(AdvisersCacheStore)
+        scheduler = _Scheduler(adapter, fail=True)
+        releaser = self._release_when_waiting(scheduler)
+
+        results = _run_concurrently([lambda: schedule_once.run(_KEY, scheduler)] * 4)
+        releaser.join()
+
+        assert scheduler.calls == 1
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert len({id(result) for result in results}) == 1
+        assert schedule_once.coalesced_count == 3
+
+    def test_run_lock_released_on_failure(self, adapter: Any) -> None:
+        """Test the lock is released if scheduling fails, so that next request schedules again."""
+        schedule_once = ScheduleOnce(AdvisersCacheStore, wait_timeout=0)
+        scheduler = _Scheduler(adapter, fail=True)
+        scheduler.proceed.set()
+
+        with pytest.raises(RuntimeError):
+            schedule_once.run(_KEY, scheduler)
+
+        assert _LOCK_KEY not in adapter.ceph.objects
+
+        scheduler.fail = False
+        assert schedule_once.run(_KEY, scheduler) == ({"analysis_id": "adviser-2"}, 202, False)
+        assert scheduler.calls == 2
+
+    def test_run_lock_held_timeout(self, adapter: Any) -> None:
+        """Test request schedules on its own once waiting for a lock holder that does not store the record timed out."""
+        adapter.store_document_record(_LOCK_KEY, {"owner": "other", "expires_at": timestamp_now() + 60})
+        schedule_once = ScheduleOnce(AdvisersCacheStore, wait_timeout=0.3, poll_interval=0.01)
+        scheduler = _Scheduler(adapter)
+        scheduler.proceed.set()
+
+        start = time.monotonic()
+        assert schedule_once.run(_KEY, scheduler) == ({"analysis_id": "adviser-1"}, 202, False)
+        assert time.monotonic() - start >= 0.3
+        assert scheduler.calls == 1
+        # The lock is not owned, it is left to its holder.
+        assert adapter.retrieve_document_record(_LOCK_KEY)["owner"] == "other"
+
+    def test_run_lock_held_record_stored(self, adapter: Any) -> None:
+        """Test request reuses cache record stored by the lock holder while waiting."""
+        adapter.store_document_record(_LOCK_KEY, {"owner": "other", "expires_at": timestamp_now() + 60})
+        schedule_once = ScheduleOnce(AdvisersCacheStore, wait_timeout=10, poll_interval=0.01)
+        scheduler = _Scheduler(adapter)
+
+        def store() -> None:
+            time.sleep(0.1)
+            adapter.store_document_record(_KEY, {"analysis_id": "adviser-other", "timestamp": timestamp_now()})
+            adapter.ceph.delete(_LOCK_KEY)
+
+        thread = threading.Thread(target=store)
+        thread.start()
+        assert schedule_once.run(_KEY, scheduler) == ({"analysis_id": "adviser-other"}, 202, True)
+        thread.join()
+        assert scheduler.calls == 0
+
+    def test_run_lock_expired(self, adapter: Any) -> None:
+        """Test an expired lock left by a crashed worker does not block scheduling."""
+        adapter.store_document_record(_LOCK_KEY, {"owner": "crashed", "expires_at": timestamp_now() - 1})
+        schedule_once = ScheduleOnce(AdvisersCacheStore, wait_timeout=10)
+        scheduler = _Scheduler(adapter)
+        scheduler.proceed.set()
+
+        start = time.monotonic()
+        assert schedule_once.run(_KEY, scheduler) == ({"analysis_id": "adviser-1"}, 202, False)
+        assert time.monotonic() - start < 5
+        assert _LOCK_KEY not in adapter.ceph.objects
+
+    def test_run_record_expired(self, adapter: Any) -> None:
+        """Test expired cache record stored by the lock holder is not reused."""
+        adapter.store_document_record(_KEY, {"analysis_id": "adviser-old", "timestamp": 0})
+        schedule_once = ScheduleOnce(AdvisersCacheStore)
+        scheduler = _Scheduler(adapter)
+        scheduler.proceed.set()
+
+        assert schedule_once.run(_KEY, scheduler) == ({"analysis_id": "adviser-1"}, 202, False)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests of decoding and encoding of JSON documents and of requests and responses."""
+
+import json
+import random
+from typing import Any
+
+import flask
+import pytest
+from connexion.jsonifier import Jsonifier
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from thoth.storages import CephStore
+
+from thoth.user_api.serialization import FastJSONProvider
+from thoth.user_api.serialization import dumps_document
+from thoth.user_api.serialization import loads
+
+_FLOATS = (0.1, 1.5, -0.0, 1e-7, 1e22, 1e16, 123456789.123, 2.5e-300, float("nan"), float("inf"), float("-inf"))
+_INTEGERS = (0, -1, 42, 2**53 + 1, 2**63 - 1, -(2**63), 2**64, 10**25)
+_STRINGS = ("", "numpy", 'a"b\\c', "line\nbreak\t", "\x00\x1f\x7f", "/path", "žluťoučký kůň", " ", "😀")
+
+
+def _random_document(rng: random.Random, depth: int = 0) -> Any:
+    """Generate a random JSON document with values that are known to be encoded differently by JSON libraries."""
+    kind = rng.random()
+    if depth > 3 or kind < 0.4:
+        return rng.choice(
+            (
+                rng.choice(_FLOATS),
+                rng.uniform(-1e6, 1e6),
+                rng.choice(_INTEGERS),
+                rng.choice(_STRINGS),
+                rng.choice((True, False, None)),
+            )
+        )
+
+    if kind < 0.7:
+        if rng.random() < 0.05:
+            # Keys other than strings are sorted differently by JSON libraries.
+            return {rng.choice(_INTEGERS[:4]) + idx: _random_document(rng, depth + 1) for idx in range(3)}
+
+        return {rng.choice(_STRINGS) + str(idx): _random_document(rng, depth + 1) for idx in range(rng.randint(0, 4))}
+
+    return [_random_document(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+
+class TestSerialization:
+    """Test decoding and encoding of JSON documents."""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_dumps_document_stored_encoding(self, seed: int) -> None:
+        """Test documents decoded and encoded again are byte-equal to documents served as stored."""
+        rng = random.Random(seed)
+        for _ in range(100):
+            blob = CephStore.dict2blob({"result": _random_document(rng, depth=1 if rng.random() < 0.5 else 0)})
+            assert dumps_document(loads(blob)) == blob + b"\n"
+
+    @pytest.mark.parametrize("provider_class", [DefaultJSONProvider, FastJSONProvider])
+    @pytest.mark.parametrize("seed", range(10))
+    def test_dumps_document_connexion(self, seed: int, provider_class: type) -> None:
+        """Test cached result documents are byte-equal to the handler responses serialized by connexion."""
+        app = Flask(__name__)
+        app.json = provider_class(app)
+        # The same as used by connexion's FlaskApi.
+        jsonifier = Jsonifier(flask.json, indent=2)
+        rng = random.Random(seed)
+        with app.app_context():
+            for _ in range(100):
+                document = {"result": _random_document(rng)}
+                assert dumps_document(document) == jsonifier.dumps(document).encode()
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_loads(self, seed: int) -> None:
+        """Test decoded documents are equal to the ones decoded by the standard library."""
+        rng = random.Random(seed)
+        for _ in range(100):
+            blob = json.dumps(_random_document(rng))
+            # Compare encoded as NaN is not equal to itself.
+            assert json.dumps(loads(blob)) == json.dumps(json.loads(blob))
+            assert json.dumps(loads(blob.encode())) == json.dumps(json.loads(blob))
+
+    def test_loads_long_number(self) -> None:
+        """Test integers wider than 64 bits are decoded exactly."""
+        assert loads('{"a": 100000000000000000000000001}') == {"a": 100000000000000000000000001}
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_fast_json_provider_dumps(self, seed: int) -> None:
+        """Test responses encoded by the fast JSON provider are byte-equal to the ones encoded by the default one."""
+        app = Flask(__name__)
+        fast = FastJSONProvider(app)
+        default = DefaultJSONProvider(app)
+        rng = random.Random(seed)
+        with app.app_context():
+            for _ in range(100):
+                document = _random_document(rng)
+                expected = json.dumps(document, sort_keys=True, indent=2)
+                assert default.dumps(document, indent=2) == expected
+                assert fast.dumps(document, indent=2) == expected
+                assert fast.dumps(document) == default.dumps(document)
+                assert fast.dumps(document, separators=(",", ":")) == default.dumps(document, separators=(",", ":"))
+
+    def test_fast_json_provider_dumps_floats(self) -> None:
+        """Test floats orjson formats differently are encoded by the standard library."""
+        app = Flask(__name__)
+        fast = FastJSONProvider(app)
+        with app.app_context():
+            document = {"a": [1e22, float("nan"), float("inf"), 1e-7], "b": {"c": "x"}}
+            assert fast.dumps(document, indent=2) == json.dumps(document, sort_keys=True, indent=2)
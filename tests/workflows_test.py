@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Tests of status reports of workflows run in the cluster."""
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from thoth.common.exceptions import NotFoundExceptionError as OpenShiftNotFound
+
+from thoth.user_api.workflows import WorkflowStatusCache
+
+_NAMESPACE = "thoth-backend"
+_LABEL_SELECTOR_PREFIX = "workflows.argoproj.io/workflow in ("
+
+
+class _Response:
+    """A response of the cluster API."""
+
+    def __init__(self, content: Dict[str, Any]) -> None:
+        """Initialize response with the given content."""
+        self._content = content
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get content of the response."""
+        return self._content
+
+
+class _FakeOpenShift:
+    """OpenShift adapter serving workflows and pods kept in memory, calls to the cluster API are recorded."""
+
+    def __init__(self) -> None:
+        """Initialize cluster with no workflows."""
+        self.workflows: Dict[str, Dict[str, Any]] = {}
+        self.pods: Dict[str, Dict[str, Any]] = {}
+        self.calls: List[Tuple[str, str]] = []
+
+    @property
+    def ocp_client(self) -> "_FakeOpenShift":
+        """Get client of the cluster API."""
+        return self
+
+    @property
+    def resources(self) -> "_FakeOpenShift":
+        """Get resources of the cluster API."""
+        return self
+
+    def add_workflow(self, workflow_id: str, state: Optional[Dict[str, Any]], node_name: str = "advise") -> None:
+        """Add a workflow with a pod running the given node in the given state, None if the pod was not created."""
+        pod_name = f"{workflow_id}-1234"
+        self.workflows[workflow_id] = {"status": {"nodes": {pod_name: {"displayName": node_name}}}}
+        if state is not None:
+            self.pods[pod_name] = {
+                "metadata": {"name": pod_name, "labels": {"workflows.argoproj.io/workflow": workflow_id}},
+                "status": {"containerStatuses": [{"state": state}]},
+            }
+
+    def get_workflow(self, name: str, namespace: str) -> Dict[str, Any]:
+        """Get workflow by its name."""
+        assert namespace == _NAMESPACE
+        self.calls.append(("workflow", name))
+        if name not in self.workflows:
+            raise OpenShiftNotFound(f"Workflow {name!r} not found")
+
+        return self.workflows[name]
+
+    def get(self, **kwargs: Any) -> Any:
+        """Get pod resource or list pods matching label selector."""
+        if "kind" in kwargs:
+            assert kwargs == {"api_version": "v1", "kind": "Pod"}
+            return self
+
+        assert kwargs["namespace"] == _NAMESPACE
+        label_selector = kwargs["label_selector"]
+        self.calls.append(("pods", label_selector))
+        assert label_selector.startswith(_LABEL_SELECTOR_PREFIX) and label_selector.endswith(")")
+        workflow_ids = label_selector[len(_LABEL_SELECTOR_PREFIX) : -1].split(",")
+        return _Response(
+            {
+                "items": [
+                    pod
+                    for pod in self.pods.values()
+                    if pod["metadata"]["labels"]["workflows.argoproj.io/workflow"] in workflow_ids
+                ]
+            }
+        )
+
+
+_RUNNING = {"running": {"startedAt": "2021-05-04T08:00:00Z"}}
+_TERMINATED = {
+    "terminated": {
+        "exitCode": 0,
+        "reason": "Completed",
+        "startedAt": "2021-05-04T08:00:00Z",
+        "finishedAt": "2021-05-04T08:01:00Z",
+        "containerID": "docker://0123",
+    }
+}
+
+
+class TestWorkflowStatusCache:
+    """Test status reports of workflows cached in memory."""
+
+    @staticmethod
+    def _cache(openshift: _FakeOpenShift) -> WorkflowStatusCache:
+        """Create cache in front of the given cluster."""
+        return WorkflowStatusCache(openshift, maxsize=100, ttl=60, terminal_ttl=3600)  # type: ignore
+
+    def test_get_workflow_node_statuses(self) -> None:
+        """Test status reports are obtained by getting the requested workflows and listing their pods at once."""
+        openshift = _FakeOpenShift()
+        openshift.add_workflow("adviser-1", _RUNNING)
+        openshift.add_workflow("adviser-2", _TERMINATED)
+        openshift.add_workflow("adviser-3", None)
+        openshift.add_workflow("adviser-4", _RUNNING, node_name="other")
+        openshift.add_workflow("adviser-unrelated", _RUNNING)
+
+        workflow_ids = ["adviser-1", "adviser-2", "adviser-3", "adviser-4", "adviser-unknown"]
+        result = self._cache(openshift).get_workflow_node_statuses("advise", workflow_ids, _NAMESPACE)
+
+        assert result == {
+            "adviser-1": {
+                "state": "running",
+                "started_at": "2021-05-04T08:00:00Z",
+                "exit_code": None,
+                "finished_at": None,
+                "reason": None,
+                "container": None,
+            },
+            "adviser-2": {
+                "state": "terminated",
+                "started_at": "2021-05-04T08:00:00Z",
+                "exit_code": 0,
+                "finished_at": "2021-05-04T08:01:00Z",
+                "reason": "Completed",
+                "container": "0123",
+            },
+            "adviser-3": None,
+            "adviser-4": None,
+            "adviser-unknown": None,
+        }
+        assert openshift.calls == [("workflow", workflow_id) for workflow_id in workflow_ids] + [
+            ("pods", f"{_LABEL_SELECTOR_PREFIX}adviser-1,adviser-2,adviser-3)")
+        ]
+
+    def test_get_workflow_node_statuses_cached(self) -> None:
+        """Test cached status reports are served without calling the cluster API, shared with single lookups."""
+        openshift = _FakeOpenShift()
+        openshift.add_workflow("adviser-1", _RUNNING)
+        openshift.add_workflow("adviser-2", _TERMINATED)
+        openshift.add_workflow("adviser-3", _RUNNING)
+        cache = self._cache(openshift)
+
+        first = cache.get_workflow_node_statuses("advise", ["adviser-1", "adviser-2"], _NAMESPACE)
+        openshift.calls.clear()
+        second = cache.get_workflow_node_statuses("advise", ["adviser-1", "adviser-2", "adviser-3"], _NAMESPACE)
+
+        assert {key: second[key] for key in first} == first
+        assert second["adviser-3"]["state"] == "running"  # type: ignore
+        assert openshift.calls == [("workflow", "adviser-3"), ("pods", f"{_LABEL_SELECTOR_PREFIX}adviser-3)")]
+        assert cache.saved_calls == 2 * WorkflowStatusCache._NODE_STATUS_CALLS
+
+        openshift.calls.clear()
+        assert cache.get_workflow_node_status("advise", "adviser-2", _NAMESPACE) == first["adviser-2"]
+        assert not openshift.calls
+
+    def test_get_workflow_node_statuses_chunks(self) -> None:
+        """Test pods are listed in chunks to keep label selectors short."""
+        openshift = _FakeOpenShift()
+        workflow_ids = [f"adviser-{idx}" for idx in range(120)]
+        for workflow_id in workflow_ids:
+            openshift.add_workflow(workflow_id, _TERMINATED)
+
+        result = self._cache(openshift).get_workflow_node_statuses("advise", workflow_ids, _NAMESPACE)
+
+        assert all(status["state"] == "terminated" for status in result.values())  # type: ignore
+        assert [call for call, _ in openshift.calls].count("pods") == 3
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Reuse of connected storage adapters across requests served by one wsgi worker."""
+
+import logging
+import threading
+import time
+from typing import Any
+from typing import Dict
+from typing import Type
+from typing import TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_AdapterT = TypeVar("_AdapterT")
+
+
+class _AdapterRegistry:
+    """Hand out connected storage adapters, adapters are created lazily on first use.
+
+    Adapters are kept per thread so that instances are never shared between threads serving
+    requests concurrently. Any call has to be done after the wsgi fork (adapters are created lazily).
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self.connections_count = 0
+        self.connect_seconds_total = 0.0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def get(self, adapter_class: Type[_AdapterT]) -> _AdapterT:
+        """Get a connected instance of the given adapter class."""
+        adapters: Dict[Type[Any], Any] = getattr(self._local, "adapters", None)  # type: ignore
+        if adapters is None:
+            adapters = self._local.adapters = {}
+
+        adapter = adapters.get(adapter_class)
+        if adapter is None or not adapter.is_connected():
+            adapter = adapter_class()
+            start = time.monotonic()
+            adapter.connect()  # type: ignore
+            duration = time.monotonic() - start
+            _LOGGER.debug("Connected %s adapter in %.3f seconds", adapter_class.__name__, duration)
+
+            with self._lock:
+                self.connections_count += 1
+                self.connect_seconds_total += duration
+
+            adapters[adapter_class] = adapter
+
+        return adapter
+
+
+# One registry per wsgi worker.
+ADAPTERS = _AdapterRegistry()
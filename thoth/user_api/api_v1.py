@@ -18,17 +18,20 @@
 """Implementation of API v1."""
 
 import connexion
-import datetime
+import copy
 import hashlib
 import json
 import logging
 import os
-import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from urllib import parse as url_parse
 from math import ceil
 from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import List
+from typing import NamedTuple
 from typing import Optional
 from typing import Tuple
 from typing import Type
@@ -37,6 +40,7 @@ import random
 import string
 import base64
 
+from flask import Response
 from flask import request
 from kubernetes import kubernetes as k8
 import requests
@@ -83,8 +87,29 @@ from thoth.messaging.package_extract_trigger import MessageContents as PackageEx
 from thoth.messaging.provenance_checker_trigger import MessageContents as ProvenanceCheckerTriggerContent
 from thoth.messaging.thoth_repo_init import MessageContents as ThothRepoInitContent
 
+from .adapters import ADAPTERS
+from .buildlog import store_build_log_stream
+from .cache import RecordCache
+from .cache import SizedLRUCache
+from .cache import Snapshot
+from .cache import TTLCache
+from .cache import timestamp_now as cache_timestamp
 from .configuration import Configuration
+from .digest import compute_digest
+from .graph import get_python_environment_markers
 from .image import get_image_metadata
+from .logs import stream_workflow_node_log
+from .pagination import decode_cursor
+from .pagination import encode_cursor
+from .pagination import get_python_package_names_page
+from .pagination import get_software_environments_page
+from .scheduling import ScheduleOnce
+from .serialization import dumps_document
+from .serialization import loads as loads_document
+from .watcher import AnalysisWatcher
+from .watcher import TERMINAL_STATES
+from .workflows import WorkflowStatusCache
+from .exceptions import BuildLogTooLargeError
 from .exceptions import ImageError
 from .exceptions import ImageBadRequestError
 from .exceptions import ImageManifestUnknownError
@@ -97,8 +122,56 @@ from . import __name__ as COMPONENT_NAME  # noqa
 PAGINATION_SIZE_MAX = int(os.getenv("THOTH_USER_API_PAGE_SIZE_MAX", 100))
 PAGINATION_SIZE_DEFAULT = int(os.getenv("THOTH_USER_API_PAGE_SIZE_DEFAULT", 25))
 
+# Adviser cache records kept in memory in front of AdvisersCacheStore.
+ADVISER_CACHE = RecordCache(
+    AdvisersCacheStore,
+    maxsize=Configuration.THOTH_ADVISER_CACHE_L1_SIZE,
+    ttl=Configuration.THOTH_ADVISER_CACHE_L1_TTL,
+)
+# Identical advise requests submitted concurrently schedule one adviser run.
+ADVISER_SCHEDULE = ScheduleOnce(AdvisersCacheStore, records=ADVISER_CACHE)
+# The same for provenance checks and image analyses.
+PROVENANCE_SCHEDULE = ScheduleOnce(ProvenanceCacheStore)
+ANALYSES_SCHEDULE = ScheduleOnce(AnalysesCacheStore)
+
+# Projected package metadata keyed by solver document id, package name, version and index.
+_SOLVER_METADATA_CACHE = TTLCache(
+    maxsize=Configuration.THOTH_SOLVER_METADATA_CACHE_SIZE,
+    ttl=Configuration.THOTH_SOLVER_METADATA_CACHE_TTL,
+)
+# Solver document entries indexed by package, keyed by solver document id.
+_SOLVER_DOCUMENT_INDEX_CACHE = TTLCache(
+    maxsize=Configuration.THOTH_SOLVER_DOCUMENT_INDEX_CACHE_SIZE,
+    ttl=Configuration.THOTH_SOLVER_METADATA_CACHE_TTL,
+)
+
+# Serialized result documents keyed by results store and analysis id, documents never change once stored.
+RESULT_DOCUMENT_CACHE = SizedLRUCache(
+    maxbytes=Configuration.THOTH_RESULT_DOCUMENT_CACHE_MAX_BYTES,
+    max_entry_bytes=Configuration.THOTH_RESULT_DOCUMENT_CACHE_MAX_ENTRY_BYTES,
+)
+
+# Number of entries in paginated listings keyed by query and filters, shared across paginated endpoints.
+_ENTRIES_COUNT_CACHE = TTLCache(
+    maxsize=Configuration.THOTH_ENTRIES_COUNT_CACHE_SIZE,
+    ttl=Configuration.THOTH_ENTRIES_COUNT_CACHE_TTL,
+)
+
 _LOGGER = logging.getLogger(__name__)
 _OPENSHIFT = OpenShift()
+# Status reports of workflows, one cache per wsgi worker.
+WORKFLOW_STATUS_CACHE = WorkflowStatusCache(
+    _OPENSHIFT,
+    maxsize=Configuration.THOTH_WORKFLOW_STATUS_CACHE_SIZE,
+    ttl=Configuration.THOTH_WORKFLOW_STATUS_CACHE_TTL,
+    terminal_ttl=Configuration.THOTH_WORKFLOW_STATUS_CACHE_TERMINAL_TTL,
+)
+
+# A bounded pool of threads used to run independent backend calls of a request concurrently.
+_EXECUTOR = ThreadPoolExecutor(max_workers=Configuration.THOTH_EXECUTOR_WORKERS)
+# Threads submitting inputs of advise batches, kept apart from the pool above as submissions can wait for
+# identical requests scheduled concurrently (see ScheduleOnce).
+_ADVISE_BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=Configuration.THOTH_ADVISE_BATCH_WORKERS)
 
 _ADVISE_PROTECTED_FIELDS = frozenset(
     {
@@ -198,7 +271,7 @@ def _create_initial_callback_secret(document_id, callbackurl, auth_header, clien
 
 def _compute_digest_params(parameters: Dict[Any, Any]) -> str:
     """Compute digest on parameters passed."""
-    return hashlib.sha256(json.dumps(parameters, sort_keys=True).encode()).hexdigest()
+    return compute_digest(parameters)
 
 
 def _compute_prev_next_page(page: int, page_count: int) -> Tuple[Optional[str], Optional[str]]:
@@ -228,6 +301,36 @@ def _compute_offset(*, page: int, page_count: int, per_page: int) -> int:
         return page * per_page
 
 
+def _get_entries_count(query_name: str, **filters: Any) -> Tuple[int, bool]:
+    """Get number of entries for paginated listings, use cached value if available.
+
+    Returns the number of entries and a flag whether the number was served from the cache.
+    """
+    from .openapi_server import GRAPH
+
+    cache_key = (query_name, tuple(sorted(filters.items())))
+    entries_count = _ENTRIES_COUNT_CACHE.get(cache_key)
+    if entries_count is not None:
+        return entries_count, True
+
+    entries_count = getattr(GRAPH, query_name)(**filters)
+    _ENTRIES_COUNT_CACHE.set(cache_key, entries_count)
+    return entries_count, False
+
+
+def _compute_next_cursor_page(next_key: Optional[List[Any]]) -> Tuple[Optional[str], Optional[str]]:
+    """Compute next page link and cursor returned in headers for paginated endpoints in cursor mode."""
+    if next_key is None:
+        return None, None
+
+    next_cursor = encode_cursor(next_key)
+    next_parameters: Dict[str, Any] = dict(request.args)
+    next_parameters["paginate_by"] = "cursor"
+    next_parameters["cursor"] = next_cursor
+    next_parameters.pop("page", None)
+    return f"{request.path}?{url_parse.urlencode(next_parameters)}", next_cursor
+
+
 def post_analyze(
     image: str,
     debug: bool = False,
@@ -258,8 +361,7 @@ def post_analyze(
     metadata = metadata_req[0]
     # We compute digest of parameters so we do not reveal any authentication specific info.
     parameters_digest = _compute_digest_params(parameters)
-    cache = AnalysesCacheStore()
-    cache.connect()
+    cache = ADAPTERS.get(AnalysesCacheStore)
     cached_document_id = metadata["digest"] + "+" + parameters_digest
 
     if not force:
@@ -275,21 +377,30 @@ def post_analyze(
         except CacheMissError:
             pass
 
-    parameters["job_id"] = _OPENSHIFT.generate_id("package-extract")
-    response, status_code = _send_schedule_message(
-        parameters, package_extract_trigger_message, PackageExtractTriggerContent
-    )
-    analysis_by_digest_store = AnalysisByDigest()
-    analysis_by_digest_store.connect()
-    analysis_by_digest_store.store_document(response, metadata["digest"])
+    def schedule() -> Tuple[Dict[str, Any], int]:
+        parameters["job_id"] = _OPENSHIFT.generate_id("package-extract")
+        response, status_code = _send_schedule_message(
+            parameters, package_extract_trigger_message, PackageExtractTriggerContent
+        )
+        analysis_by_digest_store = ADAPTERS.get(AnalysisByDigest)
+        analysis_by_digest_store.store_document(response, metadata["digest"])
 
-    if status_code == 202:
-        cache.store_document_record(cached_document_id, {"analysis_id": response["analysis_id"]})
+        if status_code == 202:
+            cache.store_document_record(cached_document_id, {"analysis_id": response["analysis_id"]})
 
-        # Store the request for traceability.
-        store = AnalysisResultsStore()
-        store.connect()
-        store.store_request(parameters["job_id"], parameters)
+            # Store the request for traceability.
+            store = ADAPTERS.get(AnalysisResultsStore)
+            store.store_request(parameters["job_id"], parameters)
+
+        return response, status_code
+
+    if force:
+        return schedule()
+
+    # Concurrent identical requests reuse the analysis scheduled by the first one.
+    response, status_code, reused = ANALYSES_SCHEDULE.run(cached_document_id, schedule)
+    if reused:
+        return {"analysis_id": response["analysis_id"], "cached": True, "parameters": parameters}, 202
 
     return response, status_code
 
@@ -303,9 +414,9 @@ def post_image_metadata(
     )
 
 
-def get_analyze(analysis_id: str) -> Tuple[Dict[str, Any], int]:
+def get_analyze(analysis_id: str) -> Union[Response, Tuple[Dict[str, Any], int]]:
     """Retrieve image analyzer result."""
-    return _get_document(
+    return _serve_document(
         AnalysisResultsStore,
         analysis_id,
         name_prefix="package-extract-",
@@ -325,6 +436,9 @@ def list_thoth_container_images(
     symbol: Optional[str] = None,
     package_name: Optional[str] = None,
     rpm_package_name: Optional[str] = None,
+    paginate_by: str = "page",
+    cursor: Optional[str] = None,
+    include_count: bool = False,
 ) -> Tuple[Dict[str, Any], int, Dict[str, Any]]:
     """List registered Thoth container images."""
     per_page = min(per_page, PAGINATION_SIZE_MAX)
@@ -332,7 +446,60 @@ def list_thoth_container_images(
 
     from .openapi_server import GRAPH
 
-    entries_count = GRAPH.get_software_environments_count_all(
+    if paginate_by == "cursor" or cursor is not None:
+        try:
+            entries, next_key = get_software_environments_page(
+                GRAPH,
+                after=decode_cursor(cursor) if cursor else None,
+                count=per_page,
+                os_name=os_name,
+                os_version=os_version,
+                python_version=python_version,
+                cuda_version=cuda_version,
+                image_name=image_name,
+                library_name=library_name,
+                symbol=symbol,
+                package_name=package_name,
+                rpm_package_name=rpm_package_name,
+            )
+        except ValueError as exc:
+            return {"error": str(exc), "parameters": parameters}, 400  # type: ignore
+
+        next_page, next_cursor = _compute_next_cursor_page(next_key)
+        headers: Dict[str, Any] = {
+            "page": page,
+            "per_page": per_page,
+            "next": next_page,
+            "next_cursor": next_cursor,
+            "prev": None,
+        }
+        if include_count:
+            headers["entries_count"], headers["entries_count_cached"] = _get_entries_count(
+                "get_software_environments_count_all",
+                is_external=False,
+                os_name=os_name,
+                os_version=os_version,
+                python_version=python_version,
+                cuda_version=cuda_version,
+                image_name=image_name,
+                library_name=library_name,
+                symbol=symbol,
+                package_name=package_name,
+                rpm_package_name=rpm_package_name,
+            )
+            headers["page_count"] = ceil(headers["entries_count"] / per_page)
+
+        return (
+            {
+                "container_images": [_transform_container_image(item) for item in entries],
+                "parameters": parameters,
+            },
+            200,
+            headers,
+        )
+
+    entries_count, entries_count_cached = _get_entries_count(
+        "get_software_environments_count_all",
         is_external=False,
         os_name=os_name,
         os_version=os_version,
@@ -363,24 +530,7 @@ def list_thoth_container_images(
         package_name=package_name,
         rpm_package_name=rpm_package_name,
     ):
-        if item.get("env_image_name") and item.get("env_image_tag"):
-            item["thoth_image_name"] = item.pop("env_image_name", None)
-            item["thoth_image_version"] = item.pop("env_image_tag", None)
-        else:
-            item["thoth_image_name"] = item.pop("thoth_s2i_image_name", None)
-            item["thoth_image_version"] = item.pop("thoth_s2i_image_version", None)
-
-        if item.get("environment_name") and item["environment_name"].startswith("quay.io"):
-            item["quay_repo_url"] = "https://%s" % item.get("environment_name")
-        else:
-            item["quay_repo_url"] = None
-
-        if item.get("package_extract_document_id"):
-            item["image_analysis_url"] = f"{request.script_root}/analyze/{item.get('package_extract_document_id')}"
-        else:
-            item["image_analysis_url"] = None
-
-        entries.append(item)
+        entries.append(_transform_container_image(item))
 
     prev_page, next_page = _compute_prev_next_page(page, per_page)
 
@@ -395,18 +545,40 @@ def list_thoth_container_images(
             "per_page": per_page,
             "page_count": page_count,
             "entries_count": entries_count,
+            "entries_count_cached": entries_count_cached,
             "next": next_page,
             "prev": prev_page,
         },
     )
 
 
+def _transform_container_image(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Adjust software environment entry retrieved from the database to be reported as a container image."""
+    if item.get("env_image_name") and item.get("env_image_tag"):
+        item["thoth_image_name"] = item.pop("env_image_name", None)
+        item["thoth_image_version"] = item.pop("env_image_tag", None)
+    else:
+        item["thoth_image_name"] = item.pop("thoth_s2i_image_name", None)
+        item["thoth_image_version"] = item.pop("thoth_s2i_image_version", None)
+
+    if item.get("environment_name") and item["environment_name"].startswith("quay.io"):
+        item["quay_repo_url"] = "https://%s" % item.get("environment_name")
+    else:
+        item["quay_repo_url"] = None
+
+    if item.get("package_extract_document_id"):
+        item["image_analysis_url"] = f"{request.script_root}/analyze/{item.get('package_extract_document_id')}"
+    else:
+        item["image_analysis_url"] = None
+
+    return item
+
+
 def get_analyze_by_hash(image_hash: str) -> Tuple[Dict[str, Any], int]:
     """Get image analysis by hash of the analyzed image."""
     parameters = locals()
 
-    analysis_by_digest_store = AnalysisByDigest()
-    analysis_by_digest_store.connect()
+    analysis_by_digest_store = ADAPTERS.get(AnalysisByDigest)
 
     try:
         analysis_info = analysis_by_digest_store.retrieve_document(image_hash)
@@ -486,9 +658,8 @@ def post_provenance_python(
             dict(**project.to_dict(), whitelisted_sources=parameters["whitelisted_sources"], debug=debug)
         )
 
-    timestamp_now = int(time.mktime(datetime.datetime.utcnow().timetuple()))
-    cache = ProvenanceCacheStore()
-    cache.connect()
+    timestamp_now = cache_timestamp()
+    cache = ADAPTERS.get(ProvenanceCacheStore)
 
     if not force:
         try:
@@ -506,42 +677,57 @@ def post_provenance_python(
         except CacheMissError:
             pass
 
-    parameters["job_id"] = _OPENSHIFT.generate_id("provenance-checker")
-    message = dict(**parameters, authenticated=authenticated)
-    message.pop("application_stack")  # Passed via Ceph.
-    response, status = _send_schedule_message(
-        message,
-        provenance_checker_trigger_message,
-        ProvenanceCheckerTriggerContent,
-        with_authentication=True,
-        authenticated=authenticated,
-    )
-
-    if status == 202:
-        cache.store_document_record(
-            cached_document_id, {"analysis_id": response["analysis_id"], "timestamp": timestamp_now}
+    def schedule() -> Tuple[Dict[str, Any], int]:
+        parameters["job_id"] = _OPENSHIFT.generate_id("provenance-checker")
+        message = dict(**parameters, authenticated=authenticated)
+        message.pop("application_stack")  # Passed via Ceph.
+        response, status = _send_schedule_message(
+            message,
+            provenance_checker_trigger_message,
+            ProvenanceCheckerTriggerContent,
+            with_authentication=True,
+            authenticated=authenticated,
         )
 
-        # Store the request for traceability.
-        store = ProvenanceResultsStore()
-        store.connect()
-        store.store_request(parameters["job_id"], parameters)
+        if status == 202:
+            cache.store_document_record(
+                cached_document_id, {"analysis_id": response["analysis_id"], "timestamp": timestamp_now}
+            )
+
+            # Store the request for traceability.
+            store = ADAPTERS.get(ProvenanceResultsStore)
+            store.store_request(parameters["job_id"], parameters)
+
+        return response, status
+
+    if force:
+        return schedule()
+
+    # Concurrent identical requests reuse the provenance check scheduled by the first one.
+    response, status, reused = PROVENANCE_SCHEDULE.run(cached_document_id, schedule)
+    if reused:
+        return (
+            {
+                "analysis_id": response["analysis_id"],
+                "cached": True,
+                "authenticated": authenticated,
+                "parameters": parameters,
+            },
+            202,
+        )
 
     return response, status
 
 
-def get_provenance_python(analysis_id: str) -> Tuple[Dict[str, Any], int]:
+def get_provenance_python(analysis_id: str) -> Union[Response, Tuple[Dict[str, Any], int]]:
     """Retrieve a provenance check result."""
-    result, status_code = _get_document(
+    return _serve_document(
         ProvenanceResultsStore,
         analysis_id,
         name_prefix="provenance-checker-",
         namespace=Configuration.THOTH_BACKEND_NAMESPACE,
+        redact=_drop_request_metadata,
     )
-    if status_code == 200:
-        # Drop any metadata associated with the request (such as origin, GitHub application info, ...)
-        result["metadata"]["arguments"]["thoth-adviser"].pop("metadata", None)
-    return result, status_code
 
 
 def get_provenance_python_log(analysis_id: str) -> Tuple[Dict[str, Any], int]:
@@ -556,18 +742,23 @@ def get_provenance_python_status(analysis_id: str) -> Tuple[Dict[str, Any], int]
     )
 
 
-def post_advise_python(
-    input: Dict[str, Any],
-    recommendation_type: Optional[str] = None,
-    source_type: Optional[str] = None,
-    debug: bool = False,
-    force: bool = False,
-    dev: bool = False,
-    origin: Optional[str] = None,
-    token: Optional[str] = None,
-) -> Tuple[Dict[str, Any], int]:
-    """Compute results for the given package or package stack using adviser."""
-    parameters = locals()
+class _AdviseSubmission(NamedTuple):
+    """A validated advise request with its cache record id."""
+
+    parameters: Dict[str, Any]
+    authenticated: bool
+    constraints: Constraints
+    cached_document_id: str
+    force: bool
+
+
+def _prepare_advise(parameters: Dict[str, Any]) -> Union[_AdviseSubmission, Tuple[Dict[str, Any], int]]:
+    """Validate parameters of an advise request and compute its cache record id, return error response if invalid."""
+    recommendation_type = parameters["recommendation_type"]
+    source_type = parameters["source_type"]
+    dev = parameters["dev"]
+    origin = parameters["origin"]
+
     # Translate request body parameters.
     parameters["application_stack"] = parameters["input"].pop("application_stack", None)
     parameters["justification"] = parameters["input"].pop("justification", None)
@@ -622,13 +813,6 @@ def post_advise_python(
     except Exception:
         return {"parameters": parameters, "error": "Invalid application stack supplied"}, 400
 
-    # We could rewrite this to a decorator and make it shared with provenance
-    # checks etc, but there are small glitches why the solution would not be
-    # generic enough to be used for all POST endpoints.
-    adviser_cache = AdvisersCacheStore()
-    adviser_cache.connect()
-
-    timestamp_now = int(time.mktime(datetime.datetime.utcnow().timetuple()))
     if authenticated:
         cached_document_id = _compute_digest_params(
             dict(
@@ -655,63 +839,50 @@ def post_advise_python(
             )
         )
 
-    if not force:
-        try:
-            cache_record = adviser_cache.retrieve_document_record(cached_document_id)
-            if cache_record["timestamp"] + Configuration.THOTH_CACHE_EXPIRATION > timestamp_now:
-                if parameters["callback_info"]:
-                    result, status_code = _get_document(
-                        AdvisersResultsStore,
-                        cache_record["analysis_id"],
-                        name_prefix="adviser-",
-                        namespace=Configuration.THOTH_BACKEND_NAMESPACE,
-                    )
-                    if status_code == 202:  # workflow scheduled/in progress
-                        _add_entry_or_create_callback_secret(
-                            document_id=cache_record["analysis_id"],
-                            callbackurl=parameters["callback_info"]["url"],
-                            auth_header=parameters["callback_info"].get("authorization"),
-                            client_data=parameters["callback_info"].get("client_data"),
-                        )
-                    else:
-                        if status_code == 200:
-                            result["metadata"]["arguments"]["thoth-adviser"].pop("metadata", None)  # rmv sensitive data
-                        body = {"result": result, "client_data": parameters["callback_info"].get("client_data")}
-                        headers = dict()
-                        if auth := parameters["callback_info"].get("authorization"):
-                            headers["Authorization"] = auth
-                        requests.post(url=parameters["callback_info"]["url"], data=body, headers=headers)
-                return (
-                    {
-                        "analysis_id": cache_record.pop("analysis_id"),
-                        "cached": True,
-                        "authenticated": authenticated,
-                        "parameters": parameters,
-                    },
-                    202,
-                )
+    return _AdviseSubmission(parameters, authenticated, constraints, cached_document_id, force)
+
+
+def _retrieve_cached_adviser_analysis_id(cached_document_id: str, timestamp_now: int) -> Optional[str]:
+    """Retrieve id of an adviser run cached for the given cache record id, if any and not expired."""
+    # We could rewrite this to a decorator and make it shared with provenance
+    # checks etc, but there are small glitches why the solution would not be
+    # generic enough to be used for all POST endpoints.
+    try:
+        cache_record = ADVISER_CACHE.retrieve_document_record(cached_document_id)
+    except CacheMissError:
+        return None
+
+    if cache_record["timestamp"] + Configuration.THOTH_CACHE_EXPIRATION > timestamp_now:
+        return cache_record["analysis_id"]  # type: ignore
+
+    return None
 
-        except CacheMissError:
-            pass
 
-    # Enum type is checked on thoth-common side to avoid serialization issue in user-api side when providing response
-    parameters["source_type"] = source_type.upper() if source_type else None
-    parameters["constraints"] = constraints.to_dict()
+def _publish_advise(submission: _AdviseSubmission, timestamp_now: int) -> Tuple[Dict[str, Any], int]:
+    """Publish adviser trigger message for the given advise request and store its cache record."""
+    parameters = submission.parameters
+    # Enum type is checked on thoth-common side to avoid serialization issue in user-api side when providing response.
+    parameters["source_type"] = parameters["source_type"].upper() if parameters["source_type"] else None
+    parameters["constraints"] = submission.constraints.to_dict()
     parameters["job_id"] = _OPENSHIFT.generate_id("adviser")
     # Remove data passed via Ceph.
-    message = dict(**parameters, authenticated=authenticated)
+    message = dict(**parameters, authenticated=submission.authenticated)
     message.pop("application_stack")
     message.pop("runtime_environment")
     message.pop("library_usage")
     message.pop("labels")
     message.pop("constraints")
     response, status = _send_schedule_message(
-        message, adviser_trigger_message, AdviserTriggerContent, with_authentication=True, authenticated=authenticated
+        message,
+        adviser_trigger_message,
+        AdviserTriggerContent,
+        with_authentication=True,
+        authenticated=submission.authenticated,
     )
 
     if status == 202:
-        adviser_cache.store_document_record(
-            cached_document_id, {"analysis_id": response["analysis_id"], "timestamp": timestamp_now}
+        ADVISER_CACHE.store_document_record(
+            submission.cached_document_id, {"analysis_id": response["analysis_id"], "timestamp": timestamp_now}
         )
 
         if parameters["callback_info"]:
@@ -723,22 +894,189 @@ def post_advise_python(
             )
 
         # Store the request for traceability.
-        store = AdvisersResultsStore()
-        store.connect()
+        store = ADAPTERS.get(AdvisersResultsStore)
         store.store_request(parameters["job_id"], parameters)
 
     return response, status
 
 
-def get_advise_python(analysis_id: str) -> Tuple[Dict[str, Any], int]:
+def _submit_advise(
+    submission: _AdviseSubmission, timestamp_now: int, cached_analysis_id: Optional[str]
+) -> Tuple[Dict[str, Any], int]:
+    """Respond with the cached adviser run or schedule a new one."""
+    if cached_analysis_id is not None:
+        return _reuse_adviser_analysis(cached_analysis_id, submission.parameters, submission.authenticated)
+
+    if submission.force:
+        return _publish_advise(submission, timestamp_now)
+
+    # Concurrent identical requests reuse the adviser run scheduled by the first one.
+    response, status, reused = ADVISER_SCHEDULE.run(
+        submission.cached_document_id, lambda: _publish_advise(submission, timestamp_now)
+    )
+    if reused:
+        return _reuse_adviser_analysis(response["analysis_id"], submission.parameters, submission.authenticated)
+
+    return response, status
+
+
+def post_advise_python(
+    input: Dict[str, Any],
+    recommendation_type: Optional[str] = None,
+    source_type: Optional[str] = None,
+    debug: bool = False,
+    force: bool = False,
+    dev: bool = False,
+    origin: Optional[str] = None,
+    token: Optional[str] = None,
+) -> Tuple[Dict[str, Any], int]:
+    """Compute results for the given package or package stack using adviser."""
+    submission = _prepare_advise(locals())
+    if not isinstance(submission, _AdviseSubmission):
+        return submission
+
+    timestamp_now = cache_timestamp()
+    cached_analysis_id = None
+    if not submission.force:
+        cached_analysis_id = _retrieve_cached_adviser_analysis_id(submission.cached_document_id, timestamp_now)
+
+    return _submit_advise(submission, timestamp_now, cached_analysis_id)
+
+
+def post_advise_python_batch(
+    body: Dict[str, Any],
+    recommendation_type: Optional[str] = None,
+    source_type: Optional[str] = None,
+    debug: bool = False,
+    force: bool = False,
+    dev: bool = False,
+    origin: Optional[str] = None,
+    token: Optional[str] = None,
+) -> Tuple[Dict[str, Any], int]:
+    """Compute results for multiple Python applications using adviser, query parameters apply to all of them."""
+    inputs = body["inputs"]
+    if len(inputs) > Configuration.THOTH_ADVISE_BATCH_SIZE_MAX:
+        return {"error": f"At most {Configuration.THOTH_ADVISE_BATCH_SIZE_MAX} inputs can be submitted at once"}, 400
+
+    if token is not None and Configuration.API_TOKEN != token:
+        return {"error": "Bad token supplied"}, 401
+
+    results: List[Dict[str, Any]] = [{} for _ in inputs]
+    submissions: Dict[int, _AdviseSubmission] = {}
+    for idx, item in enumerate(inputs):
+        submission = _prepare_advise(
+            dict(
+                input=item,
+                recommendation_type=recommendation_type,
+                source_type=source_type,
+                debug=debug,
+                force=force,
+                dev=dev,
+                origin=origin,
+                token=token,
+            )
+        )
+        if isinstance(submission, _AdviseSubmission):
+            submissions[idx] = submission
+        else:
+            response, status_code = submission
+            results[idx] = {"error": response["error"], "status_code": status_code}
+
+    # The cache store offers no bulk retrieval, distinct cache records are retrieved concurrently.
+    timestamp_now = cache_timestamp()
+    cached_document_ids = list({s.cached_document_id for s in submissions.values()}) if not force else []
+    cached_analysis_ids = dict(
+        zip(
+            cached_document_ids,
+            _ADVISE_BATCH_EXECUTOR.map(
+                lambda i: _retrieve_cached_adviser_analysis_id(i, timestamp_now), cached_document_ids
+            ),
+        )
+    )
+
+    # Identical inputs are scheduled once, concurrent submissions of the same cache record id are coalesced.
+    futures = {
+        idx: _ADVISE_BATCH_EXECUTOR.submit(
+            _submit_advise, submission, timestamp_now, cached_analysis_ids.get(submission.cached_document_id)
+        )
+        for idx, submission in submissions.items()
+    }
+    for idx, future in futures.items():
+        try:
+            response, status_code = future.result()
+        except Exception as exc:
+            _LOGGER.exception("Failed to submit advise request %d in batch", idx)
+            results[idx] = {"error": f"Failed to submit advise request: {str(exc)}", "status_code": 500}
+            continue
+
+        if status_code != 202:
+            results[idx] = {"error": response.get("error"), "status_code": status_code}
+            continue
+
+        results[idx] = {
+            "analysis_id": response["analysis_id"],
+            "cached": response["cached"],
+            "authenticated": response["authenticated"],
+        }
+
+    if any(not result.get("cached", True) for result in results):
+        # Messages are produced asynchronously, wait once for the whole batch to be delivered.
+        from .openapi_server import PRODUCER
+
+        remaining = PRODUCER.flush(Configuration.THOTH_ADVISE_BATCH_FLUSH_TIMEOUT)
+        if remaining:
+            _LOGGER.warning("%d messages were not delivered to Kafka when responding to advise batch", remaining)
+
+    return {"results": results}, 202
+
+
+def _reuse_adviser_analysis(
+    analysis_id: str, parameters: Dict[str, Any], authenticated: bool
+) -> Tuple[Dict[str, Any], int]:
+    """Respond with an already scheduled adviser run, notify callback if requested."""
+    if parameters["callback_info"]:
+        result, status_code = _get_document(
+            AdvisersResultsStore,
+            analysis_id,
+            name_prefix="adviser-",
+            namespace=Configuration.THOTH_BACKEND_NAMESPACE,
+        )
+        if status_code == 202:  # workflow scheduled/in progress
+            _add_entry_or_create_callback_secret(
+                document_id=analysis_id,
+                callbackurl=parameters["callback_info"]["url"],
+                auth_header=parameters["callback_info"].get("authorization"),
+                client_data=parameters["callback_info"].get("client_data"),
+            )
+        else:
+            if status_code == 200:
+                result["metadata"]["arguments"]["thoth-adviser"].pop("metadata", None)  # rmv sensitive data
+            body = {"result": result, "client_data": parameters["callback_info"].get("client_data")}
+            headers = dict()
+            if auth := parameters["callback_info"].get("authorization"):
+                headers["Authorization"] = auth
+            requests.post(url=parameters["callback_info"]["url"], data=body, headers=headers)
+
+    return (
+        {
+            "analysis_id": analysis_id,
+            "cached": True,
+            "authenticated": authenticated,
+            "parameters": parameters,
+        },
+        202,
+    )
+
+
+def get_advise_python(analysis_id: str) -> Union[Response, Tuple[Dict[str, Any], int]]:
     """Retrieve the given recommendation based on its id."""
-    result, status_code = _get_document(
-        AdvisersResultsStore, analysis_id, name_prefix="adviser-", namespace=Configuration.THOTH_BACKEND_NAMESPACE
+    return _serve_document(
+        AdvisersResultsStore,
+        analysis_id,
+        name_prefix="adviser-",
+        namespace=Configuration.THOTH_BACKEND_NAMESPACE,
+        redact=_drop_request_metadata,
     )
-    if status_code == 200:
-        # Drop any metadata associated with the request (such as origin, GitHub application info, ...)
-        result["metadata"]["arguments"]["thoth-adviser"].pop("metadata", None)
-    return result, status_code
 
 
 def get_advise_python_log(analysis_id: str) -> Tuple[Dict[str, Any], int]:
@@ -752,8 +1090,7 @@ def _get_log(node_name: str, analysis_id: str, namespace: str) -> Tuple[Dict[str
     try:
         log = _OPENSHIFT.get_workflow_node_log(node_name, analysis_id, namespace)
     except OpenShiftNotFound:
-        logs = WorkflowLogsStore()
-        logs.connect()
+        logs = ADAPTERS.get(WorkflowLogsStore)
         try:
             log = logs.get_log(analysis_id)
         except NotFoundError:
@@ -767,6 +1104,65 @@ def _get_log(node_name: str, analysis_id: str, namespace: str) -> Tuple[Dict[str
         return result, 200
 
 
+def get_advise_python_log_stream(
+    analysis_id: str, offset: int = 0, length: Optional[int] = None, tail: Optional[int] = None
+) -> Union[Response, Tuple[Dict[str, Any], int]]:
+    """Stream adviser log as plain text, optionally only a part of it."""
+    return _stream_log(
+        "advise",
+        analysis_id,
+        namespace=Configuration.THOTH_BACKEND_NAMESPACE,
+        offset=offset,
+        length=length,
+        tail=tail,
+    )
+
+
+def _stream_log(
+    node_name: str, analysis_id: str, namespace: str, *, offset: int, length: Optional[int], tail: Optional[int]
+) -> Union[Response, Tuple[Dict[str, Any], int]]:
+    """Stream log for a node in a workflow, the offset of the first byte sent is reported in X-Log-Offset header.
+
+    Clients following a running analysis pass the offset of the next byte they expect to obtain only new parts of
+    the log. The log does not grow anymore once it is reported to come from the archive in X-Log-Source header.
+    """
+    parameters = {"analysis_id": analysis_id, "offset": offset, "length": length, "tail": tail}
+    if tail is not None and (offset or length is not None):
+        return {"error": "Parameter tail cannot be combined with offset or length", "parameters": parameters}, 400
+
+    if tail is not None:
+        tail = min(tail, Configuration.THOTH_LOG_TAIL_MAX)
+
+    log = stream_workflow_node_log(
+        _OPENSHIFT,
+        node_name,
+        analysis_id,
+        namespace,
+        offset=offset,
+        length=length,
+        tail=tail,
+        chunk_size=Configuration.THOTH_LOG_STREAM_CHUNK_SIZE,
+    )
+    if log is None:
+        return {
+            "error": f"Log for analysis {analysis_id} was not found or it has not started yet",
+            "parameters": parameters,
+        }, 404
+
+    # No Content-Length is sent, the log is sent using chunked transfer encoding as it is read.
+    return Response(
+        log.chunks,
+        status=200,
+        mimetype="text/plain",
+        headers={
+            "X-Log-Offset": str(log.offset),
+            "X-Log-Source": log.source,
+            "Cache-Control": "no-cache" if log.source == "pod" else "private, max-age=3600",
+        },
+        direct_passthrough=True,
+    )
+
+
 def get_advise_python_status(analysis_id: str) -> Tuple[Dict[str, Any], int]:
     """Get status of an adviser run."""
     return _get_status_with_queued(
@@ -795,6 +1191,9 @@ def list_python_packages(
     os_version: Optional[str] = None,
     python_version: Optional[str] = None,
     like: Optional[str] = None,
+    paginate_by: str = "page",
+    cursor: Optional[str] = None,
+    include_count: bool = False,
 ) -> Tuple[Dict[str, Any], int, Dict[str, Any]]:
     """Get listing of solved package names."""
     per_page = min(per_page, PAGINATION_SIZE_MAX)
@@ -802,7 +1201,47 @@ def list_python_packages(
 
     from .openapi_server import GRAPH
 
-    entries_count = GRAPH.get_python_package_version_names_count_all(
+    if paginate_by == "cursor" or cursor is not None:
+        try:
+            query_result, next_key = get_python_package_names_page(
+                GRAPH,
+                after=decode_cursor(cursor) if cursor else None,
+                count=per_page,
+                os_name=os_name,
+                os_version=os_version,
+                python_version=python_version,
+                like=like,
+            )
+        except ValueError as exc:
+            return {"error": str(exc), "parameters": parameters}, 400  # type: ignore
+
+        next_page, next_cursor = _compute_next_cursor_page(next_key)
+        headers: Dict[str, Any] = {
+            "page": page,
+            "per_page": per_page,
+            "next": next_page,
+            "next_cursor": next_cursor,
+            "prev": None,
+        }
+        if include_count:
+            headers["entries_count"], headers["entries_count_cached"] = _get_entries_count(
+                "get_python_package_version_names_count_all",
+                os_name=os_name,
+                os_version=os_version,
+                python_version=python_version,
+                distinct=True,
+                like=like,
+            )
+            headers["page_count"] = ceil(headers["entries_count"] / per_page)
+
+        return (
+            {"packages": [{"package_name": i} for i in query_result], "parameters": parameters},
+            200,
+            headers,
+        )
+
+    entries_count, entries_count_cached = _get_entries_count(
+        "get_python_package_version_names_count_all",
         os_name=os_name,
         os_version=os_version,
         python_version=python_version,
@@ -833,6 +1272,7 @@ def list_python_packages(
             "per_page": per_page,
             "page_count": page_count,
             "entries_count": entries_count,
+            "entries_count_cached": entries_count_cached,
             "next": next_page,
             "prev": prev_page,
         },
@@ -851,18 +1291,7 @@ def list_python_package_versions(
 
     from .openapi_server import GRAPH
 
-    entries_count = GRAPH.get_solved_python_package_versions_count_all(
-        package_name=name,
-        distinct=True,
-        is_missing=False,
-        os_name=os_name,
-        os_version=os_version,
-        python_version=python_version,
-    )
-
-    if entries_count == 0:
-        return {"error": f"Package {name!r} not found", "parameters": parameters}, 404
-
+    # All the versions are listed, no need to count them upfront - an empty listing means the package is not known.
     query_result = GRAPH.get_solved_python_package_versions_all(
         package_name=name,
         distinct=True,
@@ -874,6 +1303,9 @@ def list_python_package_versions(
         python_version=python_version,
     )
 
+    if not query_result:
+        return {"error": f"Package {name!r} not found", "parameters": parameters}, 404
+
     if order_by and order_by in ["ASC", "DESC"]:
         query_result.sort(key=lambda x: PackageVersion.parse_semantic_version(x[1]), reverse=order_by == "DESC")
 
@@ -959,6 +1391,20 @@ def get_python_package_dependencies(
             404,
         )
 
+    markers: Dict[Tuple[str, str], Optional[str]] = {}
+    if os_name is not None and os_version is not None and python_version is not None:
+        # Resolve markers for all the dependencies at once instead of querying the database for each of them.
+        markers = get_python_environment_markers(
+            GRAPH,
+            package_name=name,
+            package_version=version,
+            index_url=index,
+            dependencies=[(entry[0], entry[1]) for entries in query_result.values() for entry in entries],
+            os_name=os_name,
+            os_version=os_version,
+            python_version=python_version,
+        )
+
     result = []
     for extra, entries in query_result.items():
         for entry in entries:
@@ -972,18 +1418,7 @@ def get_python_package_dependencies(
             )
 
             if os_name is not None and os_version is not None and python_version is not None:
-                try:
-                    result[-1]["environment_marker"] = GRAPH.get_python_environment_marker(
-                        package_name=name,
-                        package_version=version,
-                        index_url=index,
-                        dependency_name=entry[0],
-                        dependency_version=entry[1],
-                        os_name=os_name,
-                        os_version=os_version,
-                        python_version=python_version,
-                    )
-                except NotFoundError:
+                if (entry[0], entry[1]) not in markers:
                     return (
                         {
                             "error": f"No environment marker records found for package {name!r} in version "
@@ -993,6 +1428,8 @@ def get_python_package_dependencies(
                         },
                         404,
                     )
+
+                result[-1]["environment_marker"] = markers[(entry[0], entry[1])]
     return {"dependencies": result, "parameters": parameters}, 200
 
 
@@ -1018,10 +1455,174 @@ def post_build(
     if not output_image and not base_image and not build_log:
         return {"error": "No base, output nor build log provided"}, 400
 
+    # Image inspection and build log storage are independent, run them concurrently.
+    buildlog_future = _EXECUTOR.submit(_store_build_log, build_log, force=force) if build_log else None
+    return _schedule_build_analysis(
+        buildlog_future,
+        base_image=base_image,
+        base_registry_password=base_registry_password,
+        base_registry_user=base_registry_user,
+        base_registry_verify_tls=base_registry_verify_tls,
+        output_image=output_image,
+        output_registry_password=output_registry_password,
+        output_registry_user=output_registry_user,
+        output_registry_verify_tls=output_registry_verify_tls,
+        debug=debug,
+        environment_type=environment_type,
+        force=force,
+        origin=origin,
+    )
+
+
+def _parse_bool_arg(name: str, default: bool) -> bool:
+    """Parse a boolean query parameter of the current request the same way as connexion does."""
+    value = request.args.get(name)
+    if value is None:
+        return default
+
+    if value.lower() == "true":
+        return True
+
+    if value.lower() == "false":
+        return False
+
+    raise ValueError(f"Wrong type, expected 'boolean' for query parameter {name!r}")
+
+
+def post_build_log() -> Tuple[Dict[str, Any], int]:
+    """Run analysis on a build, the build log is streamed as a plain text request body.
+
+    The log is hashed and stored while it is received so that large logs do not need to be kept in memory. This
+    handler is registered directly on the Flask application as connexion reads whole request bodies. Query
+    parameters are the same as for the build analysis endpoint, base and output image are passed as query parameters.
+    Query parameters are validated here as connexion does not validate requests of this handler.
+    """
+    try:
+        base_registry_verify_tls = _parse_bool_arg("base_registry_verify_tls", True)
+        output_registry_verify_tls = _parse_bool_arg("output_registry_verify_tls", True)
+        debug = _parse_bool_arg("debug", False)
+        force = _parse_bool_arg("force", False)
+    except ValueError as exc:
+        return {"error": str(exc)}, 400
+
+    environment_type = request.args.get("environment_type", "runtime")
+    if environment_type not in ("buildtime", "runtime"):
+        return {"error": f"{environment_type!r} is not one of ['buildtime', 'runtime']"}, 400
+
+    base_image = request.args.get("base_image")
+    output_image = request.args.get("output_image")
+
+    try:
+        stored = store_build_log_stream(request.stream)
+    except BuildLogTooLargeError as exc:
+        return {"error": str(exc)}, 400
+
+    buildlog_future: Optional["Future[Tuple[str, Optional[str], str]]"] = None
+    if stored is not None:
+        buildlog_document_id, buildlog_cached_document_id = stored
+        buildlog_analysis_id = None if force else _retrieve_build_log_analysis_id(buildlog_cached_document_id)
+        buildlog_future = Future()
+        buildlog_future.set_result((buildlog_document_id, buildlog_analysis_id, buildlog_cached_document_id))
+    elif not output_image and not base_image:
+        return {"error": "No base, output nor build log provided"}, 400
+
+    return _schedule_build_analysis(
+        buildlog_future,
+        base_image=base_image,
+        base_registry_password=request.args.get("base_registry_password"),
+        base_registry_user=request.args.get("base_registry_user"),
+        base_registry_verify_tls=base_registry_verify_tls,
+        output_image=output_image,
+        output_registry_password=request.args.get("output_registry_password"),
+        output_registry_user=request.args.get("output_registry_user"),
+        output_registry_verify_tls=output_registry_verify_tls,
+        debug=debug,
+        environment_type=environment_type,
+        force=force,
+        origin=request.args.get("origin"),
+    )
+
+
+def _schedule_build_analysis(
+    buildlog_future: Optional["Future[Tuple[str, Optional[str], str]]"],
+    *,
+    base_image: Optional[str],
+    base_registry_password: Optional[str],
+    base_registry_user: Optional[str],
+    base_registry_verify_tls: bool,
+    output_image: Optional[str],
+    output_registry_password: Optional[str],
+    output_registry_user: Optional[str],
+    output_registry_verify_tls: bool,
+    debug: bool,
+    environment_type: Optional[str],
+    force: bool,
+    origin: Optional[str],
+) -> Tuple[Dict[str, Any], int]:
+    """Inspect build images and schedule build analysis, the build log is stored by the given future."""
+    base_image_future = (
+        _EXECUTOR.submit(
+            _process_build_image,
+            "base_image",
+            base_image,
+            registry_user=base_registry_user,
+            registry_password=base_registry_password,
+            verify_tls=base_registry_verify_tls,
+            force=force,
+        )
+        if base_image
+        else None
+    )
+    output_image_future = (
+        _EXECUTOR.submit(
+            _process_build_image,
+            "output_image",
+            output_image,
+            registry_user=output_registry_user,
+            registry_password=output_registry_password,
+            verify_tls=output_registry_verify_tls,
+            force=force,
+        )
+        if output_image
+        else None
+    )
+
+    # Results are collected in the same order as they were computed sequentially to keep error precedence.
     buildlog_analysis_id = None
     buildlog_document_id = None
-    if build_log:
-        buildlog_document_id, buildlog_analysis_id = _store_build_log(build_log, force=force)
+    buildlog_cached_document_id = None
+    if buildlog_future:
+        buildlog_document_id, buildlog_analysis_id, buildlog_cached_document_id = buildlog_future.result()
+
+    # Handle the base container image used during the build process.
+    base_image_analysis = None
+    base_image_analysis_id = None
+    base_cached_document_id = None
+    base_image_analysis_cached = False
+    if base_image_future:
+        base_result = base_image_future.result()
+        if base_result[1] != 200:
+            # There was an error extracting metadata, tuple holds dictionary with error report and HTTP status code.
+            return base_result  # type: ignore
+
+        base_image_analysis, base_cached_document_id = base_result[0]
+        base_image_analysis_id = base_image_analysis["analysis_id"]
+        base_image_analysis_cached = base_image_analysis["cached"]
+
+    # Handle output ("resulting") container image used during the build process.
+    output_image_analysis = None
+    output_image_analysis_id = None
+    output_cached_document_id = None
+    output_image_analysis_cached = False
+    if output_image_future:
+        output_result = output_image_future.result()
+        if output_result[1] != 200:
+            # There was an error extracting metadata, tuple holds dictionary with error report and HTTP status code.
+            return output_result  # type: ignore
+
+        output_image_analysis, output_cached_document_id = output_result[0]
+        output_image_analysis_id = output_image_analysis["analysis_id"]
+        output_image_analysis_cached = output_image_analysis["cached"]
 
     message_parameters = {
         "base_image_analysis_id": None,  # Assigned below.
@@ -1042,109 +1643,11 @@ def post_build(
         "job_id": OpenShift.generate_id("build-analysis"),
     }
 
-    cache = AnalysesCacheStore()
-    cache.connect()
-
-    # Handle the base container image used during the build process.
-    base_image_analysis = None
-    base_image_analysis_id = None
-    base_cached_document_id = None
-    base_image_analysis_cached = False
-    if base_image:
-        base_image_info = {
-            "image": base_image,
-            "registry_user": base_registry_user,
-            "registry_password": base_registry_password,
-            "verify_tls": base_registry_verify_tls,
-        }
-        metadata_req = _do_get_image_metadata(**base_image_info)
-
-        if metadata_req[1] != 200:
-            # There was an error extracting metadata, tuple holds dictionary with error report and HTTP status code.
-            return metadata_req
-
-        base_image_metadata = metadata_req[0]
-        # We compute digest of parameters so we do not reveal any authentication specific info.
-        parameters_digest = _compute_digest_params(base_image)
-        base_cached_document_id = base_image_metadata["digest"] + "+" + parameters_digest
-
-        base_image_analysis_id = OpenShift.generate_id("package-extract")
-        if not force:
-            try:
-                base_image_analysis_id = cache.retrieve_document_record(base_cached_document_id).pop("analysis_id")
-                base_image_analysis_cached = True
-            except CacheMissError:
-                pass
-
-        base_image_analysis = {
-            "analysis_id": base_image_analysis_id,
-            "cached": base_image_analysis_cached,
-            "parameters": {
-                "base_image": base_image,
-                # "registry_password": base_registry_password,
-                # "registry_user": base_registry_user,
-                "registry_verify_tls": base_registry_verify_tls,
-            },
-        }
-
-        analysis_by_digest_store = AnalysisByDigest()
-        analysis_by_digest_store.connect()
-        analysis_by_digest_store.store_document(base_image_analysis, base_image_metadata["digest"])
-
-    # Handle output ("resulting") container image used during the build process.
-    output_image_analysis = None
-    output_image_analysis_id = None
-    output_cached_document_id = None
-    output_image_analysis_cached = False
-    if output_image:
-        output_image_info = {
-            "image": output_image,
-            "registry_user": output_registry_user,
-            "registry_password": output_registry_password,
-            "verify_tls": output_registry_verify_tls,
-        }
-        metadata_req = _do_get_image_metadata(**output_image_info)
-
-        if metadata_req[1] != 200:
-            # There was an error extracting metadata, tuple holds dictionary with error report and HTTP status code.
-            return metadata_req
-
-        output_image_metadata = metadata_req[0]
-        # We compute digest of parameters so we do not reveal any authentication specific info.
-        parameters_digest = _compute_digest_params(output_image)
-        output_cached_document_id = output_image_metadata["digest"] + "+" + parameters_digest
-
-        output_image_analysis_id = OpenShift.generate_id("package-extract")
-        if not force:
-            try:
-                output_image_analysis_id = cache.retrieve_document_record(output_cached_document_id).pop("analysis_id")
-                output_image_analysis_cached = True
-            except CacheMissError:
-                pass
-
-        output_image_analysis = {
-            "analysis_id": output_image_analysis_id,
-            "cached": output_image_analysis_cached,
-            "parameters": {
-                "output_image": output_image,
-                # "registry_password": output_registry_password,
-                # "registry_user": output_registry_user,
-                "registry_verify_tls": output_registry_verify_tls,
-            },
-        }
-
-        analysis_by_digest_store = AnalysisByDigest()
-        analysis_by_digest_store.connect()
-        analysis_by_digest_store.store_document(output_image_analysis, output_image_metadata["digest"])
-
     message_parameters["base_image_analysis_id"] = base_image_analysis_id if not base_image_analysis_cached else None
     message_parameters["output_image_analysis_id"] = (
         output_image_analysis_id if not output_image_analysis_cached else None
     )
 
-    if build_log:
-        pass
-
     response, status = _send_schedule_message(
         message_parameters, build_analysis_trigger_message, BuildAnalysisTriggerContent
     )
@@ -1153,6 +1656,7 @@ def post_build(
         return response, status
 
     # Store all the ids to caches once the message is sent so subsequent calls work as expected.
+    cache = ADAPTERS.get(AnalysesCacheStore)
 
     if base_cached_document_id:
         cache.store_document_record(base_cached_document_id, {"analysis_id": base_image_analysis_id})
@@ -1160,17 +1664,14 @@ def post_build(
     if output_cached_document_id:
         cache.store_document_record(output_cached_document_id, {"analysis_id": output_image_analysis_id})
 
-    if build_log and not buildlog_analysis_id:
-        buildlogs_cache = BuildLogsAnalysesCacheStore()
-        buildlogs_cache.connect()
-        cached_document_id = _compute_digest_params(build_log)
+    if buildlog_cached_document_id and not buildlog_analysis_id:
+        buildlogs_cache = ADAPTERS.get(BuildLogsAnalysesCacheStore)
         buildlogs_cache.store_document_record(
-            cached_document_id, {"analysis_id": message_parameters["buildlog_parser_id"]}
+            buildlog_cached_document_id, {"analysis_id": message_parameters["buildlog_parser_id"]}
         )
 
     if base_image_analysis or output_image_analysis:
-        store = AnalysisResultsStore()
-        store.connect()
+        store = ADAPTERS.get(AnalysisResultsStore)
         if base_image_analysis_id:
             store.store_request(base_image_analysis_id, base_image_analysis)
         if output_image_analysis:
@@ -1190,29 +1691,80 @@ def post_build(
     )
 
 
-def _store_build_log(build_log: Dict[str, Any], force: bool = False) -> Tuple[str, Optional[str]]:
-    """Store the given build log, use cached entry if available."""
-    buildlog_analysis_id = None
-    if not force:
-        cache = BuildLogsAnalysesCacheStore()
-        cache.connect()
-        cached_document_id = _compute_digest_params(build_log)
+def _process_build_image(
+    image_key: str,
+    image: str,
+    *,
+    registry_user: Optional[str] = None,
+    registry_password: Optional[str] = None,
+    verify_tls: bool = True,
+    force: bool = False,
+) -> Tuple[Any, int]:
+    """Inspect an image used during a build, look up cached analysis and store analysis by image digest."""
+    metadata_req = _do_get_image_metadata(
+        image, registry_user=registry_user, registry_password=registry_password, verify_tls=verify_tls
+    )
+    if metadata_req[1] != 200:
+        return metadata_req
+
+    image_metadata = metadata_req[0]
+    # We compute digest of parameters so we do not reveal any authentication specific info.
+    parameters_digest = _compute_digest_params(image)
+    cached_document_id = image_metadata["digest"] + "+" + parameters_digest
 
+    image_analysis_id = OpenShift.generate_id("package-extract")
+    image_analysis_cached = False
+    if not force:
+        cache = ADAPTERS.get(AnalysesCacheStore)
         try:
-            cache_record = cache.retrieve_document_record(cached_document_id)
-            buildlog_analysis_id = cache_record.pop("analysis_id")
+            image_analysis_id = cache.retrieve_document_record(cached_document_id).pop("analysis_id")
+            image_analysis_cached = True
         except CacheMissError:
             pass
 
-    adapter = BuildLogsStore()
-    adapter.connect()
+    image_analysis = {
+        "analysis_id": image_analysis_id,
+        "cached": image_analysis_cached,
+        "parameters": {
+            image_key: image,
+            # "registry_password": registry_password,
+            # "registry_user": registry_user,
+            "registry_verify_tls": verify_tls,
+        },
+    }
+
+    analysis_by_digest_store = ADAPTERS.get(AnalysisByDigest)
+    analysis_by_digest_store.store_document(image_analysis, image_metadata["digest"])
+
+    return (image_analysis, cached_document_id), 200
+
+
+def _store_build_log(build_log: Dict[str, Any], force: bool = False) -> Tuple[str, Optional[str], str]:
+    """Store the given build log, use cached entry if available.
+
+    Return document id, id of a cached analysis (if any) and id of the build log cache record.
+    """
+    # Digest is computed once per request, it is used to store the cache record once the analysis is scheduled.
+    cached_document_id = _compute_digest_params(build_log)
+    buildlog_analysis_id = None if force else _retrieve_build_log_analysis_id(cached_document_id)
+
+    adapter = ADAPTERS.get(BuildLogsStore)
     document_id = adapter.store_document(build_log)
-    return document_id, buildlog_analysis_id
+    return document_id, buildlog_analysis_id, cached_document_id
+
+
+def _retrieve_build_log_analysis_id(cached_document_id: str) -> Optional[str]:
+    """Retrieve id of a cached analysis of a build log, if any."""
+    cache = ADAPTERS.get(BuildLogsAnalysesCacheStore)
+    try:
+        return cache.retrieve_document_record(cached_document_id).pop("analysis_id")  # type: ignore
+    except CacheMissError:
+        return None
 
 
-def get_buildlog(document_id: str) -> Tuple[Dict[str, Any], int]:
+def get_buildlog(document_id: str) -> Union[Response, Tuple[Dict[str, Any], int]]:
     """Retrieve the given buildlog."""
-    return _get_document(BuildLogsStore, document_id)
+    return _serve_document(BuildLogsStore, document_id)
 
 
 def schedule_kebechet_webhook(body: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
@@ -1233,10 +1785,16 @@ def schedule_kebechet_webhook(body: Dict[str, Any]) -> Tuple[Dict[str, Any], int
     else:
         return {"error": "This webhook is not supported"}, 501
 
+    from .openapi_server import GRAPH
+
     # Handle installation events and check if webhooks are relevant to Kebechet.
-    preprocess_payload = PayloadProcess().process(webhook_payload=webhook_payload)
+    payload_process = PayloadProcess(graph=GRAPH)
+    preprocess_payload = payload_process.process(webhook_payload=webhook_payload)
     # Not schedule workload if pre-processed payload is None.
     if preprocess_payload is None:
+        if payload_process.installation_report is not None:
+            return {"installation_report": payload_process.installation_report}, 200
+
         # No action made - eg. ignored payload or invalid payload.
         return {}, 200
 
@@ -1284,10 +1842,14 @@ def get_python_package_version_metadata(
     if not solver_documents:
         return {"parameters": parameters, "error": "No records found for the given request"}, 404
 
-    solver_store = SolverResultsStore()
-    solver_store.connect()
+    # Solver documents are immutable once written, the projected metadata can be reused.
+    cache_key = (solver_documents[0], name, version, index)
+    metadata = _SOLVER_METADATA_CACHE.get(cache_key)
+    if metadata is not None:
+        return {"metadata": copy.deepcopy(metadata), "parameters": parameters}, 200
+
     try:
-        solver_document = solver_store.retrieve_document(solver_documents[0])
+        solver, solver_entries = _get_solver_document_index(solver_documents[0])
     except NotFoundError:
         return {
             "parameters": parameters,
@@ -1295,17 +1857,8 @@ def get_python_package_version_metadata(
             f"please contact administrator with the provided information: {solver_documents[0]}",
         }, 500
 
-    solver_name = "-".join(solver_document["metadata"]["document_id"].split("-")[:4])
-    solver = OpenShift.parse_python_solver_name(solver_name)
-
-    for solver_entry in solver_document["result"]["tree"]:
-        if (
-            PackageVersion.normalize_python_package_name(solver_entry["package_name"]) == name
-            and solver_entry["package_version"] == version
-            and solver_entry["index_url"] == index
-        ):
-            break
-    else:
+    solver_entry = solver_entries.get((name, version, index))
+    if solver_entry is None:
         # This should not happen as data synced to the database should be based on the solver document content.
         _LOGGER.error(
             "Solver document %r has no records for %r in version %r from %r",
@@ -1320,9 +1873,8 @@ def get_python_package_version_metadata(
             f"with the provided information: {solver_documents[0]}",
         }, 500
 
-    package_name = solver_entry["package_name"]
-    package_version = solver_entry["package_version"]
-    index_url = solver_entry["index_url"]
+    # The entry is shared in the document index, work on a copy.
+    solver_entry = copy.deepcopy(solver_entry)
 
     deps = {}
     for dependency_entry in solver_entry["dependencies"]:
@@ -1358,7 +1910,38 @@ def get_python_package_version_metadata(
     solver_entry.pop("package_version_requested", None)
     solver_entry.pop("sha256", None)
 
-    return {"metadata": solver_entry, "parameters": parameters}, 200
+    _SOLVER_METADATA_CACHE.set(cache_key, solver_entry)
+    return {"metadata": copy.deepcopy(solver_entry), "parameters": parameters}, 200
+
+
+def _get_solver_document_index(
+    document_id: str,
+) -> Tuple[Dict[str, str], Dict[Tuple[str, str, str], Dict[str, Any]]]:
+    """Get solver info and solver tree entries of the given solver document indexed by package, version and index.
+
+    Solver documents are immutable, the index is cached so the document is not downloaded and scanned again.
+    """
+    cached = _SOLVER_DOCUMENT_INDEX_CACHE.get(document_id)
+    if cached is not None:
+        return cached
+
+    solver_document = ADAPTERS.get(SolverResultsStore).retrieve_document(document_id)
+
+    solver_name = "-".join(solver_document["metadata"]["document_id"].split("-")[:4])
+    solver = OpenShift.parse_python_solver_name(solver_name)
+
+    entries: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for solver_entry in solver_document["result"]["tree"]:
+        key = (
+            PackageVersion.normalize_python_package_name(solver_entry["package_name"]),
+            solver_entry["package_version"],
+            solver_entry["index_url"],
+        )
+        # The first entry wins, as in a linear scan.
+        entries.setdefault(key, solver_entry)
+
+    _SOLVER_DOCUMENT_INDEX_CACHE.set(document_id, (solver, entries))
+    return solver, entries
 
 
 def _construct_status_queued(analysis_id: str) -> Dict[str, Any]:
@@ -1380,38 +1963,92 @@ def _get_document(
     if name_prefix and not analysis_id.startswith(name_prefix):
         return {"error": "Wrong analysis id provided", "parameters": parameters}, 400
 
-    adapter = adapter_class()
-    adapter.connect()
+    adapter = ADAPTERS.get(adapter_class)
 
     try:
         result = adapter.retrieve_document(analysis_id)
         return result, 200
     except NotFoundError:
-        if namespace:
-            try:
-                status = _OPENSHIFT.get_workflow_status_report(analysis_id, namespace=namespace)
-                if status["state"] == "running":
-                    return {"error": "Analysis is still in progress", "status": status, "parameters": parameters}, 202
-                elif status["state"] in ("failed", "error"):
-                    return {"error": "Analysis was not successful", "status": status, "parameters": parameters}, 400
-                elif status["state"] == "pending":
-                    return {"error": "Analysis is being scheduled", "status": status, "parameters": parameters}, 202
-                else:
-                    # Can be:
-                    #   - return 500 to user as this is our issue
-                    raise ValueError(f"Unreachable - unknown workflow state: {status}")
-            except OpenShiftNotFound:
-                if adapter.request_exists(analysis_id):
-                    return _construct_status_queued(analysis_id), 202
-
-        return {"error": f"Requested result for analysis {analysis_id!r} was not found", "parameters": parameters}, 404
+        return _report_missing_document(adapter, analysis_id, namespace)
+
+
+def _report_missing_document(adapter: Any, analysis_id: str, namespace: Optional[str]) -> Tuple[Dict[str, Any], int]:
+    """Report state of an analysis whose result document is not stored."""
+    parameters = {"analysis_id": analysis_id}
+    if namespace:
+        try:
+            status = WORKFLOW_STATUS_CACHE.get_workflow_status_report(analysis_id, namespace=namespace)
+            if status["state"] == "running":
+                return {"error": "Analysis is still in progress", "status": status, "parameters": parameters}, 202
+            elif status["state"] in ("failed", "error"):
+                return {"error": "Analysis was not successful", "status": status, "parameters": parameters}, 400
+            elif status["state"] == "pending":
+                return {"error": "Analysis is being scheduled", "status": status, "parameters": parameters}, 202
+            else:
+                # Can be:
+                #   - return 500 to user as this is our issue
+                raise ValueError(f"Unreachable - unknown workflow state: {status}")
+        except OpenShiftNotFound:
+            if adapter.request_exists(analysis_id):
+                return _construct_status_queued(analysis_id), 202
+
+    return {"error": f"Requested result for analysis {analysis_id!r} was not found", "parameters": parameters}, 404
+
+
+def _drop_request_metadata(result: Dict[str, Any]) -> None:
+    """Drop any metadata associated with the request (such as origin, GitHub application info, ...)."""
+    result["metadata"]["arguments"]["thoth-adviser"].pop("metadata", None)
+
+
+def _serve_document(
+    adapter_class,
+    analysis_id: str,
+    name_prefix: Optional[str] = None,
+    namespace: Optional[str] = None,
+    redact: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Union[Response, Tuple[Dict[str, Any], int]]:
+    """Serve a result document, redacted by the given callable, with strong ETag so that clients can cache it.
+
+    Result documents never change once stored, their serialized form is kept in memory and clients and proxies are
+    allowed to cache it forever. Responses other than the document (in progress, not found, ...) are not cached.
+    """
+    cache_key = (adapter_class.__name__, analysis_id)
+    cached = RESULT_DOCUMENT_CACHE.get(cache_key)
+    if cached is None:
+        if name_prefix and not analysis_id.startswith(name_prefix):
+            return {"error": "Wrong analysis id provided", "parameters": {"analysis_id": analysis_id}}, 400
+
+        adapter = ADAPTERS.get(adapter_class)
+        try:
+            blob = adapter.ceph.retrieve_blob(analysis_id)
+        except NotFoundError:
+            return _report_missing_document(adapter, analysis_id, namespace)
+
+        if redact is None and not blob.endswith(b"\n"):
+            # Documents are stored with sorted keys and indentation (see dumps_document), they are served as stored
+            # without decoding and encoding them again.
+            body = blob + b"\n"
+        else:
+            result = loads_document(blob)
+            if redact is not None:
+                redact(result)
+            body = dumps_document(result)
+
+        cached = (body, hashlib.sha256(body).hexdigest())
+        RESULT_DOCUMENT_CACHE.set(cache_key, cached, size=len(body))
+
+    body, etag = cached
+    response = Response(body, status=200, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response.make_conditional(request)
 
 
 def _get_status(node_name: str, analysis_id: str, namespace: str) -> Tuple[Dict[str, Any], int]:
     """Get status for a node in a workflow."""
     result: Dict[str, Any] = {"parameters": {"analysis_id": analysis_id}}
     try:
-        status = _OPENSHIFT.get_workflow_node_status(node_name, analysis_id, namespace)
+        status = WORKFLOW_STATUS_CACHE.get_workflow_node_status(node_name, analysis_id, namespace)
     except OpenShiftNotFound:
         result.update({"error": f"Status for analysis {analysis_id} was not found or it has not started yet"})
         return result, 404
@@ -1420,6 +2057,99 @@ def _get_status(node_name: str, analysis_id: str, namespace: str) -> Tuple[Dict[
         return result, 200
 
 
+# Prefix of analysis ids, workflow node reporting status, namespace and results store of each analysis type.
+_ANALYSIS_STATUS_SOURCES = (
+    ("adviser-", "advise", Configuration.THOTH_BACKEND_NAMESPACE, AdvisersResultsStore),
+    ("provenance-checker-", "provenance-check", Configuration.THOTH_BACKEND_NAMESPACE, ProvenanceResultsStore),
+    ("package-extract-", "extract-packages", Configuration.THOTH_MIDDLETIER_NAMESPACE, AnalysisResultsStore),
+)
+
+
+# Watches analyses requested by clients waiting for their completion, one per wsgi worker.
+ANALYSIS_WATCHER = AnalysisWatcher(
+    _OPENSHIFT, interval=Configuration.THOTH_WATCH_INTERVAL, max_clients=Configuration.THOTH_WATCH_CLIENTS_MAX
+)
+
+
+def watch_analysis(analysis_id: str, state: Optional[str] = None, timeout: int = 20) -> Tuple[Dict[str, Any], int]:
+    """Wait until state of an adviser run, provenance check or image analysis differs from the given one (long-poll).
+
+    Respond with the current state once it changes or once the timeout expires. Clients pass the state they got in
+    the previous response until the analysis is ready or it fails.
+    """
+    parameters = {"analysis_id": analysis_id, "state": state, "timeout": timeout}
+    for prefix, _, namespace, adapter_class in _ANALYSIS_STATUS_SOURCES:
+        if analysis_id.startswith(prefix):
+            break
+    else:
+        return {"error": "Wrong analysis id provided", "parameters": parameters}, 400
+
+    report = ANALYSIS_WATCHER.watch(
+        analysis_id,
+        namespace=namespace,
+        adapter_class=adapter_class,
+        known_state=state,
+        timeout=min(timeout, Configuration.THOTH_WATCH_TIMEOUT_MAX),
+    )
+    if report["state"] == "not_found":
+        return {"error": f"Requested analysis {analysis_id!r} was not found", "parameters": parameters}, 404
+
+    return (
+        {
+            "analysis_id": analysis_id,
+            "state": report["state"],
+            "status": report["status"],
+            "ready": report["state"] == "ready",
+            "finished": report["state"] in TERMINAL_STATES,
+        },
+        200,
+    )
+
+
+def post_analyses_status(body: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+    """Get status of multiple adviser runs, provenance checks and image analyses at once.
+
+    Analyses are grouped by namespace so that pods of workflows are listed once per group instead of being retrieved
+    one by one, status reports are cached. Requests of analyses not found in the cluster are checked concurrently.
+    """
+    analysis_ids = list(dict.fromkeys(body["analysis_ids"]))
+    if len(analysis_ids) > Configuration.THOTH_STATUS_BATCH_SIZE_MAX:
+        return {"error": f"At most {Configuration.THOTH_STATUS_BATCH_SIZE_MAX} analyses can be queried at once"}, 400
+
+    statuses: Dict[str, Dict[str, Any]] = {}
+    groups: Dict[Tuple[str, str, Type[Any]], List[str]] = {}
+    for analysis_id in analysis_ids:
+        for prefix, node_name, namespace, adapter_class in _ANALYSIS_STATUS_SOURCES:
+            if analysis_id.startswith(prefix):
+                groups.setdefault((node_name, namespace, adapter_class), []).append(analysis_id)
+                break
+        else:
+            statuses[analysis_id] = {"error": "Wrong analysis id provided", "status_code": 400}
+
+    not_found: List[Tuple[Type[Any], str]] = []
+    for (node_name, namespace, adapter_class), group_ids in groups.items():
+        for analysis_id, status in WORKFLOW_STATUS_CACHE.get_workflow_node_statuses(
+            node_name, group_ids, namespace
+        ).items():
+            if status is None:
+                not_found.append((adapter_class, analysis_id))
+            else:
+                statuses[analysis_id] = {"status": status, "status_code": 200}
+
+    queued = _EXECUTOR.map(lambda item: ADAPTERS.get(item[0]).request_exists(item[1]), not_found)
+    for (_, analysis_id), is_queued in zip(not_found, queued):
+        if is_queued:
+            result = _construct_status_queued(analysis_id)
+            statuses[analysis_id] = {"error": result["error"], "status": result["status"], "status_code": 200}
+        else:
+            statuses[analysis_id] = {
+                "error": f"Status for analysis {analysis_id} was not found or it has not started yet",
+                "status_code": 404,
+            }
+
+    return {"statuses": statuses}, 200
+
+
 def _get_status_with_queued(
     adapter: Union[AdvisersResultsStore, ProvenanceResultsStore, AnalysisResultsStore],
     node_name: str,
@@ -1429,8 +2159,7 @@ def _get_status_with_queued(
     """Get status of an analysis, check queued requests as well."""
     result, status_code = _get_status(node_name=node_name, analysis_id=analysis_id, namespace=namespace)
     if status_code == 404:
-        adapter_instance = adapter()
-        adapter_instance.connect()
+        adapter_instance = ADAPTERS.get(adapter)
         if adapter_instance.request_exists(analysis_id):
             return _construct_status_queued(analysis_id), 200
     return result, status_code
@@ -1529,8 +2258,8 @@ def get_package_from_imported_packages(import_name: str) -> Tuple[Dict[str, Any]
         )
 
 
-def list_python_environments() -> Dict[str, List[Dict[str, str]]]:
-    """Get environments available based on solvers installed."""
+def _compute_python_environments() -> List[Dict[str, str]]:
+    """Compute environments available based on solvers installed."""
     result = []
     for solver in _OPENSHIFT.get_solver_names():
         item = _OPENSHIFT.parse_python_solver_name(solver)
@@ -1543,4 +2272,15 @@ def list_python_environments() -> Dict[str, List[Dict[str, str]]]:
             result.append(other_item)
 
     result.sort(key=lambda i: (i.get("os_name"), i.get("os_version"), i.get("python_version")))
-    return {"environment": result}
+    return result
+
+
+# Solvers installed change only on redeploy, keep a snapshot instead of querying the cluster on each request.
+PYTHON_ENVIRONMENTS_SNAPSHOT = Snapshot(
+    _compute_python_environments, ttl=Configuration.THOTH_PYTHON_ENVIRONMENTS_SNAPSHOT_TTL
+)
+
+
+def list_python_environments() -> Dict[str, List[Dict[str, str]]]:
+    """Get environments available based on solvers installed."""
+    return {"environment": [dict(item) for item in PYTHON_ENVIRONMENTS_SNAPSHOT.get()]}
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Ingestion of build logs streamed in request body."""
+
+import codecs
+import hashlib
+import logging
+import tempfile
+from json.encoder import encode_basestring_ascii
+from typing import BinaryIO
+from typing import Optional
+from typing import Tuple
+
+from thoth.storages import BuildLogsStore
+
+from .adapters import ADAPTERS
+from .configuration import Configuration
+from .exceptions import BuildLogTooLargeError
+
+_LOGGER = logging.getLogger(__name__)
+
+# The streamed log is stored as {"log": ...} document. Its encoding is produced piece by piece - the prefix and
+# suffix surround the escaped log in the same way as BuildLogsStore (indented JSON) and cache keys
+# (json.dumps(..., sort_keys=True)) encode the document.
+_DOCUMENT_PREFIX = b'{\n  "log": "'
+_DOCUMENT_SUFFIX = b'"\n}'
+_DIGEST_PREFIX = b'{"log": "'
+_DIGEST_SUFFIX = b'"}'
+
+
+def store_build_log_stream(
+    stream: BinaryIO,
+    *,
+    max_length: int = Configuration.THOTH_BUILD_LOG_STREAM_MAX_LENGTH,
+    chunk_size: int = Configuration.THOTH_BUILD_LOG_STREAM_CHUNK_SIZE,
+) -> Optional[Tuple[str, str]]:
+    """Store build log read from the given stream, return build log document id and id of its cache record.
+
+    The log is read, hashed and written to a temporary file chunk by chunk, the file is then uploaded to
+    object storage. Memory used does not depend on the size of the log. Document id and cache record id are the same
+    as if the log was submitted as {"log": ...} in the build analysis request body. Empty logs are not stored, None
+    is returned the same way as if no log was submitted.
+    """
+    document_hasher = hashlib.sha256(_DOCUMENT_PREFIX)
+    digest_hasher = hashlib.sha256(_DIGEST_PREFIX)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    length = 0
+
+    with tempfile.NamedTemporaryFile(prefix="buildlog-") as document_file:
+        document_file.write(_DOCUMENT_PREFIX)
+        while True:
+            chunk = stream.read(chunk_size)
+            length += len(chunk)
+            if length > max_length:
+                raise BuildLogTooLargeError(f"Build log exceeded {max_length} bytes allowed")
+
+            # Escaping is done per character, escaped chunks concatenate to the escaped log.
+            encoded = encode_basestring_ascii(decoder.decode(chunk, final=not chunk))[1:-1].encode("ascii")
+            document_hasher.update(encoded)
+            digest_hasher.update(encoded)
+            document_file.write(encoded)
+
+            if not chunk:
+                break
+
+        if length == 0:
+            return None
+
+        document_hasher.update(_DOCUMENT_SUFFIX)
+        digest_hasher.update(_DIGEST_SUFFIX)
+        document_file.write(_DOCUMENT_SUFFIX)
+        document_file.flush()
+
+        document_id = "buildlog-" + document_hasher.hexdigest()
+        _LOGGER.debug("Storing streamed build log of %d bytes as %r", length, document_id)
+        ADAPTERS.get(BuildLogsStore).ceph.store_file(document_file.name, document_id)
+
+    return document_id, digest_hasher.hexdigest()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Process-local caches used to avoid repeated round-trips to backing services."""
+
+import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+from typing import Type
+
+from thoth.storages.exceptions import CacheMissError
+
+from .adapters import ADAPTERS
+from .configuration import Configuration
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def timestamp_now() -> int:
+    """Get timestamp stored in cache records and lock records and compared against them.
+
+    Records have always been stamped with UTC wall clock time converted as if it was local time. All the writers and
+    readers use this helper so that records stay comparable regardless of the timezone of the container.
+    """
+    return int(time.mktime(datetime.datetime.utcnow().timetuple()))
+
+
+class TTLCache:
+    """A thread-safe, size-bounded LRU cache with per-entry expiration.
+
+    The cache lives in the memory of one wsgi worker - it is not shared across workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Initialize cache with the given capacity and default time-to-live in seconds."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get number of entries stored in the cache, including expired ones not yet purged."""
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retrieve an entry from the cache, return default if not present or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store an entry in the cache, optionally with a time-to-live different from the default one."""
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """Remove the given entry from the cache, if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all the entries from the cache."""
+        with self._lock:
+            self._data.clear()
+
+
+class SizedLRUCache:
+    """A thread-safe LRU cache bounded by the total size of the entries stored, for immutable values.
+
+    The cache lives in the memory of one wsgi worker - it is not shared across workers.
+    """
+
+    def __init__(self, maxbytes: int, max_entry_bytes: Optional[int] = None) -> None:
+        """Initialize cache with the given budget in bytes, entries larger than max_entry_bytes are not stored."""
+        self.maxbytes = maxbytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else maxbytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get number of entries stored in the cache."""
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retrieve an entry from the cache, return default if not present."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, size: int) -> None:
+        """Store an entry of the given size in bytes in the cache, evicting least recently used entries if needed."""
+        if size > self.max_entry_bytes or size > self.maxbytes:
+            return
+
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.size -= previous[0]
+
+            self._data[key] = (size, value)
+            self.size += size
+            while self.size > self.maxbytes:
+                _, (evicted_size, _) = self._data.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+
+class Snapshot:
+    """A per-worker snapshot of a computed value, refreshed in background once it gets stale.
+
+    Stale values are served while the refresh is in progress (stale-while-revalidate), only the very first
+    computation is done synchronously. If a refresh fails, the stale value is kept and served.
+    """
+
+    def __init__(self, compute: Callable[[], Any], ttl: float) -> None:
+        """Initialize snapshot computed by the given callable, the snapshot is considered stale after ttl seconds."""
+        self.ttl = ttl
+        self._compute = compute
+        self._value: Any = None
+        self._computed_at: Optional[float] = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def age(self) -> Optional[float]:
+        """Get age of the snapshot in seconds, None if not computed yet."""
+        if self._computed_at is None:
+            return None
+
+        return time.monotonic() - self._computed_at
+
+    def _refresh(self) -> None:
+        """Recompute the snapshot."""
+        try:
+            value = self._compute()
+        except Exception:
+            _LOGGER.exception("Failed to refresh snapshot, keeping the stale one")
+        else:
+            self._value = value
+            self._computed_at = time.monotonic()
+        finally:
+            self._refreshing = False
+
+    def get(self) -> Any:
+        """Get the snapshot, trigger background refresh if it is stale."""
+        if self._computed_at is None:
+            with self._lock:
+                if self._computed_at is None:
+                    self._value = self._compute()
+                    self._computed_at = time.monotonic()
+
+            return self._value
+
+        if time.monotonic() - self._computed_at > self.ttl:
+            with self._lock:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh, daemon=True).start()
+
+        return self._value
+
+
+class RecordCache:
+    """An in-memory cache (L1) of records kept in a Ceph based cache store (L2) such as AdvisersCacheStore.
+
+    Records carry a timestamp, they are kept in memory at most until they expire based on THOTH_CACHE_EXPIRATION.
+    Records stored by other workers become visible once the in-memory entry expires.
+    """
+
+    def __init__(self, adapter_class: Type[Any], maxsize: int, ttl: float) -> None:
+        """Initialize cache in front of the given cache store adapter class."""
+        self.adapter_class = adapter_class
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _store_l1(self, document_id: str, record: Dict[str, Any]) -> None:
+        """Store the given record in memory respecting its expiration."""
+        ttl = self._cache.ttl
+        if "timestamp" in record:
+            ttl = min(ttl, record["timestamp"] + Configuration.THOTH_CACHE_EXPIRATION - timestamp_now())
+
+        if ttl > 0:
+            self._cache.set(document_id, dict(record), ttl=ttl)
+
+    def retrieve_document_record(self, document_id: str) -> Dict[str, Any]:
+        """Retrieve the given record, raise CacheMissError if not present in any of the tiers."""
+        record = self._cache.get(document_id)
+        if record is not None:
+            self.l1_hits += 1
+            return dict(record)
+
+        try:
+            record = ADAPTERS.get(self.adapter_class).retrieve_document_record(document_id)
+        except CacheMissError:
+            self.misses += 1
+            raise
+
+        self.l2_hits += 1
+        self._store_l1(document_id, record)
+        return record
+
+    def store_document_record(self, document_id: str, record: Dict[str, Any]) -> None:
+        """Store the given record in both tiers."""
+        ADAPTERS.get(self.adapter_class).store_document_record(document_id, record)
+        self._store_l1(document_id, record)
+
+    def hit_ratios(self) -> Tuple[float, float]:
+        """Get ratio of lookups served from memory (L1) and from the cache store (L2)."""
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        if lookups == 0:
+            return 0.0, 0.0
+
+        return self.l1_hits / lookups, self.l2_hits / lookups
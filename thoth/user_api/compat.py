@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Access to private members of thoth-storages and thoth-common adapters.
+
+Queries and reads not provided by the public interface of the adapters are built on their private members. All such
+accesses are kept in this module so that they can be reviewed when thoth-storages or thoth-common is updated.
+
+Checked against thoth-storages 0.74.2 and thoth-common 0.36.6.
+"""
+
+from typing import Any
+from typing import ContextManager
+from typing import Dict
+from typing import Optional
+
+from sqlalchemy.orm import Query
+from sqlalchemy.orm import Session
+from thoth.common import OpenShift
+from thoth.storages import CephStore
+from thoth.storages import GraphDatabase
+
+
+def session_scope(graph: GraphDatabase) -> ContextManager[Session]:
+    """Get a database session of the graph adapter, committed on success and rolled back on failure."""
+    return graph._session_scope()
+
+
+def construct_python_package_version_names_query(
+    graph: GraphDatabase,
+    session: Session,
+    *,
+    os_name: Optional[str] = None,
+    os_version: Optional[str] = None,
+    python_version: Optional[str] = None,
+    like: Optional[str] = None,
+) -> Query:
+    """Construct query for Python package names used by GraphDatabase.get_python_package_version_names_all."""
+    return graph._construct_python_package_version_names_query(
+        session, os_name=os_name, os_version=os_version, python_version=python_version, like=like
+    )
+
+
+def construct_software_environments_query(
+    graph: GraphDatabase,
+    session: Session,
+    software_environment: Any,
+    **filters: Optional[str],
+) -> Query:
+    """Construct query for software environments used by GraphDatabase.get_software_environments_all."""
+    return graph._construct_software_environments_query(
+        session=session, software_environment=software_environment, **filters
+    )
+
+
+def ceph_object(ceph: CephStore, object_key: str) -> Any:
+    """Get S3 object (boto3 resource) of the given key stored by the Ceph adapter, the adapter has to be connected."""
+    return ceph._s3.Object(ceph.bucket, f"{ceph.prefix}{object_key}")
+
+
+def workflow_status_report(status: Dict[str, Dict[str, str]]) -> Dict[str, Optional[str]]:
+    """Construct status report from state of a pod container, see OpenShift.get_workflow_status_report."""
+    return OpenShift._status_report(status)
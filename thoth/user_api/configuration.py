@@ -37,6 +37,95 @@ class Configuration:
     API_TOKEN = os.getenv("THOTH_USER_API_TOKEN")
     # Give cache 3 hours by default.
     THOTH_CACHE_EXPIRATION = int(os.getenv("THOTH_CACHE_EXPIRATION", timedelta(hours=3).total_seconds()))
+    # In-memory cache of adviser cache records kept in each worker.
+    THOTH_ADVISER_CACHE_L1_SIZE = int(os.getenv("THOTH_USER_API_ADVISER_CACHE_L1_SIZE", 1024))
+    THOTH_ADVISER_CACHE_L1_TTL = int(os.getenv("THOTH_USER_API_ADVISER_CACHE_L1_TTL", 300))
+    # Lock kept in cache stores while scheduling a workflow, identical requests wait for the lock holder.
+    THOTH_SCHEDULE_LOCK_TTL = int(os.getenv("THOTH_USER_API_SCHEDULE_LOCK_TTL", 30))
+    THOTH_SCHEDULE_LOCK_WAIT_TIMEOUT = float(os.getenv("THOTH_USER_API_SCHEDULE_LOCK_WAIT_TIMEOUT", 10))
+
+    # Per-worker cache of image metadata obtained from container image registries.
+    THOTH_IMAGE_METADATA_CACHE_SIZE = int(os.getenv("THOTH_USER_API_IMAGE_METADATA_CACHE_SIZE", 512))
+    THOTH_IMAGE_METADATA_CACHE_TTL = int(os.getenv("THOTH_USER_API_IMAGE_METADATA_CACHE_TTL", 300))
+    THOTH_IMAGE_METADATA_CACHE_NEGATIVE_TTL = int(os.getenv("THOTH_USER_API_IMAGE_METADATA_CACHE_NEGATIVE_TTL", 30))
+
+    # Backend used to inspect container images - "skopeo" or "registry" (talk to registry API directly).
+    THOTH_IMAGE_INSPECTION_BACKEND = os.getenv("THOTH_USER_API_IMAGE_INSPECTION_BACKEND", "skopeo")
+    THOTH_REGISTRY_TIMEOUT = float(os.getenv("THOTH_USER_API_REGISTRY_TIMEOUT", 30))
+    THOTH_REGISTRY_POOL_CONNECTIONS = int(os.getenv("THOTH_USER_API_REGISTRY_POOL_CONNECTIONS", 10))
+    THOTH_REGISTRY_POOL_MAXSIZE = int(os.getenv("THOTH_USER_API_REGISTRY_POOL_MAXSIZE", 10))
+
+    # Number of threads used to run independent backend calls of a request concurrently.
+    THOTH_EXECUTOR_WORKERS = int(os.getenv("THOTH_USER_API_EXECUTOR_WORKERS", 8))
+
+    # Maximum number of inputs in one advise batch, time to wait for delivery of messages produced for a batch.
+    THOTH_ADVISE_BATCH_SIZE_MAX = int(os.getenv("THOTH_USER_API_ADVISE_BATCH_SIZE_MAX", 100))
+    THOTH_ADVISE_BATCH_FLUSH_TIMEOUT = float(os.getenv("THOTH_USER_API_ADVISE_BATCH_FLUSH_TIMEOUT", 10))
+    # Number of threads submitting inputs of advise batches, shared by all the batches handled by a wsgi worker.
+    THOTH_ADVISE_BATCH_WORKERS = int(os.getenv("THOTH_USER_API_ADVISE_BATCH_WORKERS", 8))
+
+    # Maximum number of analyses queried in one bulk status request.
+    THOTH_STATUS_BATCH_SIZE_MAX = int(os.getenv("THOTH_USER_API_STATUS_BATCH_SIZE_MAX", 200))
+
+    # Interval of checking analyses clients wait for, maximum time a client waits for a change (kept below
+    # gunicorn worker timeout).
+    THOTH_WATCH_INTERVAL = float(os.getenv("THOTH_USER_API_WATCH_INTERVAL", 2))
+    THOTH_WATCH_TIMEOUT_MAX = int(os.getenv("THOTH_USER_API_WATCH_TIMEOUT_MAX", 25))
+    # Maximum number of clients waiting in one wsgi worker, kept below the number of threads of the worker. No client
+    # waits by default unless threaded workers are enabled (see gunicorn.conf.py), a waiting client would block a
+    # sync worker.
+    THOTH_THREADED_WORKERS = bool(int(os.getenv("THOTH_USER_API_THREADED_WORKERS", 0)))
+    THOTH_WATCH_CLIENTS_MAX = int(os.getenv("THOTH_USER_API_WATCH_CLIENTS_MAX", 8 if THOTH_THREADED_WORKERS else 0))
+
+    # Build logs streamed to the build analysis endpoint, read and stored in chunks.
+    THOTH_BUILD_LOG_STREAM_MAX_LENGTH = int(os.getenv("THOTH_USER_API_BUILD_LOG_STREAM_MAX_LENGTH", 256 * 1024 * 1024))
+    THOTH_BUILD_LOG_STREAM_CHUNK_SIZE = int(os.getenv("THOTH_USER_API_BUILD_LOG_STREAM_CHUNK_SIZE", 64 * 1024))
+
+    # Workflow logs streamed to clients, read in chunks; maximum number of trailing bytes requested at once.
+    THOTH_LOG_STREAM_CHUNK_SIZE = int(os.getenv("THOTH_USER_API_LOG_STREAM_CHUNK_SIZE", 64 * 1024))
+    THOTH_LOG_TAIL_MAX = int(os.getenv("THOTH_USER_API_LOG_TAIL_MAX", 1024 * 1024))
+    # Timeouts in seconds for connecting to the cluster API and for waiting for data when reading logs of pods.
+    THOTH_LOG_STREAM_CONNECT_TIMEOUT = float(os.getenv("THOTH_USER_API_LOG_STREAM_CONNECT_TIMEOUT", 10))
+    THOTH_LOG_STREAM_READ_TIMEOUT = float(os.getenv("THOTH_USER_API_LOG_STREAM_READ_TIMEOUT", 60))
+
+    # Number of repositories of a GitHub App installation event written to the database in one transaction.
+    THOTH_INSTALLATION_CHUNK_SIZE = max(1, int(os.getenv("THOTH_USER_API_INSTALLATION_CHUNK_SIZE", 100)))
+
+    # Per-worker cache of number of entries reported by paginated endpoints.
+    THOTH_ENTRIES_COUNT_CACHE_SIZE = int(os.getenv("THOTH_USER_API_ENTRIES_COUNT_CACHE_SIZE", 256))
+    THOTH_ENTRIES_COUNT_CACHE_TTL = int(os.getenv("THOTH_USER_API_ENTRIES_COUNT_CACHE_TTL", 600))
+
+    # Per-worker cache of responses served by read-only catalogue endpoints.
+    THOTH_RESPONSE_CACHE_SIZE = int(os.getenv("THOTH_USER_API_RESPONSE_CACHE_SIZE", 256))
+    THOTH_RESPONSE_CACHE_TTL = int(os.getenv("THOTH_USER_API_RESPONSE_CACHE_TTL", 300))
+
+    # Age after which the snapshot of Python environments (solvers installed) is refreshed in background.
+    THOTH_PYTHON_ENVIRONMENTS_SNAPSHOT_TTL = int(os.getenv("THOTH_USER_API_PYTHON_ENVIRONMENTS_SNAPSHOT_TTL", 600))
+
+    # Per-worker caches of package metadata projected from immutable solver documents.
+    THOTH_SOLVER_METADATA_CACHE_SIZE = int(os.getenv("THOTH_USER_API_SOLVER_METADATA_CACHE_SIZE", 1024))
+    THOTH_SOLVER_DOCUMENT_INDEX_CACHE_SIZE = int(os.getenv("THOTH_USER_API_SOLVER_DOCUMENT_INDEX_CACHE_SIZE", 32))
+    THOTH_SOLVER_METADATA_CACHE_TTL = int(
+        os.getenv("THOTH_USER_API_SOLVER_METADATA_CACHE_TTL", timedelta(days=1).total_seconds())
+    )
+
+    # Per-worker cache of serialized analysis result documents, bounded by their total size in bytes.
+    THOTH_RESULT_DOCUMENT_CACHE_MAX_BYTES = int(
+        os.getenv("THOTH_USER_API_RESULT_DOCUMENT_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+    )
+    THOTH_RESULT_DOCUMENT_CACHE_MAX_ENTRY_BYTES = int(
+        os.getenv("THOTH_USER_API_RESULT_DOCUMENT_CACHE_MAX_ENTRY_BYTES", 16 * 1024 * 1024)
+    )
+
+    # Use orjson (if installed) to decode requests and result documents and to encode responses.
+    THOTH_JSON_FAST = bool(int(os.getenv("THOTH_USER_API_JSON_FAST", 0)))
+
+    # Per-worker cache of workflow status reports, states that do not change anymore are kept longer.
+    THOTH_WORKFLOW_STATUS_CACHE_SIZE = int(os.getenv("THOTH_USER_API_WORKFLOW_STATUS_CACHE_SIZE", 4096))
+    THOTH_WORKFLOW_STATUS_CACHE_TTL = float(os.getenv("THOTH_USER_API_WORKFLOW_STATUS_CACHE_TTL", 5))
+    THOTH_WORKFLOW_STATUS_CACHE_TERMINAL_TTL = int(
+        os.getenv("THOTH_USER_API_WORKFLOW_STATUS_CACHE_TERMINAL_TTL", timedelta(hours=1).total_seconds())
+    )
 
     JAEGER_HOST = os.getenv("JAEGER_HOST", "localhost")
 
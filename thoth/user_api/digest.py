@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Digests of request parameters used as cache keys."""
+
+import hashlib
+import json
+import logging
+from json.encoder import encode_basestring_ascii
+from typing import Any
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+# One-shot encoder producing the same output as json.dumps(..., sort_keys=True).
+_ENCODER = json.JSONEncoder(sort_keys=True)
+# Strings longer than this (e.g. build logs) are encoded and hashed in chunks of this size.
+_STRING_CHUNK_SIZE = 1 << 20
+
+
+def _update_value(update: Callable[[bytes], None], value: Any) -> None:
+    """Feed canonical encoding of a value into the hash."""
+    if isinstance(value, str) and len(value) > _STRING_CHUNK_SIZE:
+        # Escaping is done per character, escaped chunks concatenate to the escaped string.
+        update(b'"')
+        for idx in range(0, len(value), _STRING_CHUNK_SIZE):
+            update(encode_basestring_ascii(value[idx : idx + _STRING_CHUNK_SIZE])[1:-1].encode("ascii"))
+        update(b'"')
+    else:
+        update(_ENCODER.encode(value).encode("ascii"))
+
+
+def _update_component(update: Callable[[bytes], None], component: Any) -> None:
+    """Feed canonical encoding of a component into the hash, objects and arrays are fed item by item."""
+    if isinstance(component, dict) and component and all(isinstance(key, str) for key in component):
+        update(b"{")
+        for idx, key in enumerate(sorted(component)):
+            if idx:
+                update(b", ")
+            update(_ENCODER.encode(key).encode("ascii"))
+            update(b": ")
+            _update_value(update, component[key])
+        update(b"}")
+    elif isinstance(component, (list, tuple)) and component:
+        update(b"[")
+        for idx, item in enumerate(component):
+            if idx:
+                update(b", ")
+            _update_value(update, item)
+        update(b"]")
+    else:
+        _update_value(update, component)
+
+
+def compute_digest(parameters: Any) -> str:
+    """Compute SHA-256 digest of the canonical JSON encoding of the given parameters.
+
+    The digest equals to SHA-256 of json.dumps(parameters, sort_keys=True) so that cache records keyed by
+    digests computed before stay valid. The encoding is hashed incrementally, one top-level component at a time,
+    so that no single string holding the whole encoding (e.g. including a full lock file or a build log) is built.
+    """
+    hasher = hashlib.sha256()
+    update = hasher.update
+
+    if isinstance(parameters, dict) and parameters and all(isinstance(key, str) for key in parameters):
+        update(b"{")
+        for idx, key in enumerate(sorted(parameters)):
+            if idx:
+                update(b", ")
+            update(_ENCODER.encode(key).encode("ascii"))
+            update(b": ")
+            _update_component(update, parameters[key])
+        update(b"}")
+    else:
+        _update_component(update, parameters)
+
+    return hasher.hexdigest()
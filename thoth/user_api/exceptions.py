@@ -48,3 +48,7 @@ class ImageInvalidCredentialsError(ImageError):
 
 class ImageInvalidReferenceFormatError(ImageError):
     """An exception raised if the given image reference could not be parsed by Skopeo."""
+
+
+class BuildLogTooLargeError(UserApiExceptionError):
+    """An exception raised if the build log streamed exceeds the allowed size."""
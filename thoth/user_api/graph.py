@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Bulk graph database queries used by API handlers, not provided by the graph database adapter."""
+
+import logging
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from sqlalchemy import tuple_
+from thoth.common import map_os_name
+from thoth.common.helpers import normalize_os_version
+from thoth.storages import GraphDatabase
+from thoth.storages.graph.models import DependsOn
+from thoth.storages.graph.models import PythonPackageIndex
+from thoth.storages.graph.models import PythonPackageVersion
+from thoth.storages.graph.models import PythonPackageVersionEntity
+
+from .compat import session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_python_environment_markers(
+    graph: GraphDatabase,
+    package_name: str,
+    package_version: str,
+    index_url: str,
+    *,
+    dependencies: List[Tuple[str, str]],
+    os_name: str,
+    os_version: str,
+    python_version: str,
+) -> Dict[Tuple[str, str], Optional[str]]:
+    """Get Python environment markers for all the given dependencies of a package in one query.
+
+    This is a bulk variant of GraphDatabase.get_python_environment_marker, dependencies with no record
+    are not present in the returned mapping.
+    """
+    if not dependencies:
+        return {}
+
+    index_url = graph.normalize_python_index_url(index_url)
+    package_name = graph.normalize_python_package_name(package_name)
+    package_version = graph.normalize_python_package_version(package_version)
+    os_name = map_os_name(os_name)
+    os_version = normalize_os_version(os_name, os_version)
+
+    with session_scope(graph) as session:
+        query = (
+            session.query(PythonPackageVersion)
+            .filter(PythonPackageVersion.package_name == package_name)
+            .filter(PythonPackageVersion.package_version == package_version)
+            .filter(PythonPackageVersion.os_name == os_name)
+            .filter(PythonPackageVersion.os_version == os_version)
+            .filter(PythonPackageVersion.python_version == python_version)
+            .join(PythonPackageIndex)
+            .filter(PythonPackageIndex.url == index_url)
+            .join(DependsOn)
+            .join(PythonPackageVersionEntity)
+            .filter(
+                tuple_(PythonPackageVersionEntity.package_name, PythonPackageVersionEntity.package_version).in_(
+                    list(set(dependencies))
+                )
+            )
+            .with_entities(
+                PythonPackageVersionEntity.package_name,
+                PythonPackageVersionEntity.package_version,
+                DependsOn.marker,
+            )
+        )
+
+        result: Dict[Tuple[str, str], Optional[str]] = {}
+        for dependency_name, dependency_version, marker in query.all():
+            # Keep the first marker found, the same way as the single-dependency query does.
+            result.setdefault((dependency_name, dependency_version), marker)
+
+        return result
@@ -17,12 +17,18 @@
 
 """Manipulation with images - routines for image checks and first inspections."""
 
+import copy
+import hashlib
 import logging
 import shlex
 
 from typing import Optional
+from typing import Tuple
 from thoth.analyzer import run_command
 
+from .cache import TTLCache
+from .configuration import Configuration
+from .registry import registry_inspect
 from .exceptions import ImageInvalidCredentialsError
 from .exceptions import ImageError
 from .exceptions import ImageBadRequestError
@@ -48,6 +54,26 @@ _TRANSLATION_TABLE = {
     "Env": "env",
 }
 
+# Errors that are stable for the given image reference and can be cached for a short time.
+_NEGATIVE_CACHE_ERRORS = (ImageManifestUnknownError, ImageInvalidReferenceFormatError)
+
+# One cache per wsgi worker, shared across requests served by the worker.
+IMAGE_METADATA_CACHE = TTLCache(
+    maxsize=Configuration.THOTH_IMAGE_METADATA_CACHE_SIZE,
+    ttl=Configuration.THOTH_IMAGE_METADATA_CACHE_TTL,
+)
+
+
+def _get_cache_key(
+    image_name: str, registry_user: Optional[str], registry_password: Optional[str], verify_tls: bool
+) -> Tuple[str, bool, Optional[str]]:
+    """Compute cache key for the given image, credentials are kept only as a fingerprint."""
+    credentials_fingerprint = None
+    if registry_user and registry_password:
+        credentials_fingerprint = hashlib.sha256(f"{registry_user}:{registry_password}".encode()).hexdigest()
+
+    return image_name, verify_tls, credentials_fingerprint
+
 
 def get_image_metadata(
     image_name: str,
@@ -56,15 +82,52 @@ def get_image_metadata(
     registry_password: Optional[str] = None,
     verify_tls: bool = True,
 ) -> dict:
-    """Get metadata for the given image and image repository."""
+    """Get metadata for the given image and image repository, use cached results if available."""
+    if (registry_user and not registry_password) or (not registry_user and registry_password):
+        raise ImageBadRequestError(
+            "Both parameters registry_user and registry_password have to be supplied for registry authentication"
+        )
+
+    cache_key = _get_cache_key(image_name, registry_user, registry_password, verify_tls)
+    cached = IMAGE_METADATA_CACHE.get(cache_key)
+    if isinstance(cached, ImageError):
+        # Raise a fresh instance so that tracebacks do not accumulate on the cached one.
+        raise type(cached)(str(cached))
+    elif cached is not None:
+        return copy.deepcopy(cached)
+
+    inspect = registry_inspect if Configuration.THOTH_IMAGE_INSPECTION_BACKEND == "registry" else _skopeo_inspect
+    try:
+        image_info = inspect(
+            image_name,
+            registry_user=registry_user,
+            registry_password=registry_password,
+            verify_tls=verify_tls,
+        )
+    except _NEGATIVE_CACHE_ERRORS as exc:
+        IMAGE_METADATA_CACHE.set(cache_key, exc, ttl=Configuration.THOTH_IMAGE_METADATA_CACHE_NEGATIVE_TTL)
+        raise
+
+    result = {}
+    for key, value in image_info.items():
+        result[_TRANSLATION_TABLE[key]] = value
+
+    IMAGE_METADATA_CACHE.set(cache_key, result)
+    return copy.deepcopy(result)
+
+
+def _skopeo_inspect(
+    image_name: str,
+    *,
+    registry_user: Optional[str] = None,
+    registry_password: Optional[str] = None,
+    verify_tls: bool = True,
+) -> dict:
+    """Obtain metadata for the given image using skopeo, keys are kept as reported by skopeo."""
     cmd = "skopeo inspect "
     if registry_user and registry_password:
         credentials = shlex.quote(f"{registry_user}:{registry_password})")
         cmd += f"--creds {credentials}"
-    elif (registry_user and not registry_password) or (not registry_user and registry_password):
-        raise ImageBadRequestError(
-            "Both parameters registry_user and registry_password have to be supplied for registry authentication"
-        )
 
     if not verify_tls:
         cmd += "--tls-verify=false "
@@ -73,11 +136,7 @@ def get_image_metadata(
     result = run_command(cmd, is_json=True, raise_on_error=False)
 
     if result.return_code == 0:
-        result_dict = {}
-        for key, value in result.stdout.items():
-            result_dict[_TRANSLATION_TABLE[key]] = value
-
-        return result_dict
+        return result.stdout
 
     if "manifest unknown" in result.stderr:
         raise ImageManifestUnknownError("Unknown manifest for the given image")
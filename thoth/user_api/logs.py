@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Streaming parts of workflow logs from running pods or from the archive of workflow logs."""
+
+import logging
+from typing import Any
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+
+import botocore.exceptions
+import requests
+
+from thoth.common import OpenShift
+from thoth.common.exceptions import NotFoundExceptionError as OpenShiftNotFound
+from thoth.storages import WorkflowLogsStore
+from thoth.storages.exceptions import MultipleFoundError
+
+from .adapters import ADAPTERS
+from .compat import ceph_object
+from .configuration import Configuration
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LogStream(NamedTuple):
+    """A part of a log streamed in chunks."""
+
+    chunks: Iterator[bytes]
+    # Offset of the first byte streamed in the whole log.
+    offset: int
+    # "pod" if the log is read from a pod (and can still grow), "archive" if read from the archive of logs.
+    source: str
+
+
+def _iter_pod_log(response: requests.Response, offset: int, chunk_size: int) -> Iterator[bytes]:
+    """Stream log read from a pod, skipping the given number of bytes."""
+    try:
+        for chunk in response.iter_content(chunk_size):
+            if offset >= len(chunk):
+                offset -= len(chunk)
+                continue
+
+            yield chunk[offset:]
+            offset = 0
+    finally:
+        response.close()
+
+
+def _stream_pod_log(
+    openshift: OpenShift,
+    pod_name: str,
+    namespace: str,
+    *,
+    offset: int,
+    length: Optional[int],
+    tail: Optional[int],
+    chunk_size: int,
+) -> Optional[LogStream]:
+    """Stream log of the main container of a pod, None if the pod has not been initialized yet.
+
+    Kubernetes API cannot start reading a log at an offset, bytes before the offset are read from the cluster but
+    not sent to the client. Kubernetes API cannot read trailing bytes either - if tail is given, the whole log is
+    read from the cluster before the first byte is sent, keeping only the tail in a buffer of the given size. Reads
+    time out if the cluster stops sending data, so that a stalled connection does not block the thread forever.
+    """
+    params: Any = {"container": "main"}
+    if tail is None and length is not None:
+        params["limitBytes"] = offset + length
+
+    response = requests.get(
+        f"{openshift.openshift_api_url}/api/v1/namespaces/{namespace}/pods/{pod_name}/log",
+        headers={"Authorization": f"Bearer {openshift.token}"},
+        verify=openshift.kubernetes_verify_tls,
+        params=params,
+        stream=True,
+        timeout=(Configuration.THOTH_LOG_STREAM_CONNECT_TIMEOUT, Configuration.THOTH_LOG_STREAM_READ_TIMEOUT),
+    )
+
+    if response.status_code in (400, 404):
+        response.close()
+        if response.status_code == 404:
+            raise OpenShiftNotFound(f"Pod with id {pod_name} was not found in namespace {namespace}")
+        # If Pod has not been initialized yet, there is returned 400 status code.
+        return None
+
+    try:
+        response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+
+    if tail is None:
+        return LogStream(_iter_pod_log(response, offset, chunk_size), offset, "pod")
+
+    size = 0
+    buffer = bytearray()
+    try:
+        for chunk in response.iter_content(chunk_size):
+            size += len(chunk)
+            buffer += chunk
+            if len(buffer) > tail:
+                del buffer[:-tail]
+    finally:
+        response.close()
+
+    return LogStream(iter((bytes(buffer),)), size - len(buffer), "pod")
+
+
+def _iter_archived_log(body: Any, chunk_size: int) -> Iterator[bytes]:
+    """Stream body of a log retrieved from the archive."""
+    try:
+        for chunk in iter(lambda: body.read(chunk_size), b""):
+            yield chunk
+    finally:
+        body.close()
+
+
+def _stream_archived_log(
+    workflow_id: str,
+    *,
+    offset: int,
+    length: Optional[int],
+    tail: Optional[int],
+    chunk_size: int,
+) -> Optional[LogStream]:
+    """Stream log of a workflow from the archive using a ranged read, None if the log is not archived."""
+    ceph = ADAPTERS.get(WorkflowLogsStore).ceph
+    results = list(ceph.get_document_listing(workflow_id))
+    if len(results) > 1:
+        raise MultipleFoundError(
+            f"Multiple results match the given workflow_id ({workflow_id!r}) provided: {results!r}"
+        )
+
+    # Make sure users do not use workflow id prefix, the same way as WorkflowLogsStore.get_log does.
+    if not results or not results[0].startswith(f"{workflow_id}/"):
+        return None
+
+    byte_range = None
+    if tail is not None:
+        byte_range = f"bytes=-{tail}"
+    elif length is not None:
+        byte_range = f"bytes={offset}-{offset + length - 1}"
+    elif offset:
+        byte_range = f"bytes={offset}-"
+
+    obj = ceph_object(ceph, results[0])
+    try:
+        response = obj.get(Range=byte_range) if byte_range else obj.get()
+    except botocore.exceptions.ClientError as exc:
+        if exc.response["Error"]["Code"] != "InvalidRange":
+            raise
+
+        # Reading past the end of the log (or the tail of an empty log), there is nothing to stream.
+        return LogStream(iter(()), offset if tail is None else 0, "archive")
+
+    start = 0
+    content_range = response.get("ContentRange")
+    if content_range:
+        # In form of "bytes <start>-<end>/<size>".
+        start = int(content_range.split(" ", maxsplit=1)[1].split("-", maxsplit=1)[0])
+
+    return LogStream(_iter_archived_log(response["Body"], chunk_size), start, "archive")
+
+
+def stream_workflow_node_log(
+    openshift: OpenShift,
+    node_name: str,
+    workflow_id: str,
+    namespace: str,
+    *,
+    offset: int = 0,
+    length: Optional[int] = None,
+    tail: Optional[int] = None,
+    chunk_size: int,
+) -> Optional[LogStream]:
+    """Stream log of a node in a workflow, None if the log is not available.
+
+    The log is read from the pod while the workflow is present in the cluster, from the archive of workflow logs
+    otherwise. Only bytes starting at the given offset are streamed, optionally at most length bytes, or only the
+    given number of trailing bytes if tail is given.
+    """
+    try:
+        pod_name = openshift.get_workflow_pod_name(node_name, workflow_id, namespace)
+        return _stream_pod_log(
+            openshift, pod_name, namespace, offset=offset, length=length, tail=tail, chunk_size=chunk_size
+        )
+    except OpenShiftNotFound:
+        _LOGGER.debug("Workflow %r not found in namespace %r, streaming archived log", workflow_id, namespace)
+
+    return _stream_archived_log(workflow_id, offset=offset, length=length, tail=tail, chunk_size=chunk_size)
@@ -31,6 +31,8 @@ class MetricsValues(object):
         self.metric_cache_hit_adviser_unauth = 0
         self.metric_cache_hit_provenance_checker_auth = 0
         self.metric_cache_hit_provenance_checker_unauth = 0
+        self.metric_cache_adviser_l1_hit_ratio = 0.0
+        self.metric_cache_adviser_l2_hit_ratio = 0.0
 
     def update_adviser_cache_hit_metric(self, is_auth: bool = False):
         """Update adviser cache hit metric values."""
@@ -45,3 +47,8 @@ class MetricsValues(object):
             self.metric_cache_hit_provenance_checker_auth += 1
         else:
             self.metric_cache_hit_provenance_checker_unauth += 1
+
+    def update_adviser_cache_hit_ratio_metric(self, l1_hit_ratio: float, l2_hit_ratio: float):
+        """Update ratio of adviser cache lookups served from memory (L1) and from the cache store (L2)."""
+        self.metric_cache_adviser_l1_hit_ratio = l1_hit_ratio
+        self.metric_cache_adviser_l2_hit_ratio = l2_hit_ratio
@@ -18,12 +18,14 @@
 """Thoth User API entrypoint."""
 
 
+import hashlib
 import os
 import sys
 import logging
 import traceback
 from datetime import datetime
 from typing import List
+from typing import Optional
 
 import connexion
 from connexion.resolver import RestyResolver
@@ -43,8 +45,22 @@ import thoth.messaging.producer as producer
 from thoth.storages import GraphDatabase
 from thoth.storages.exceptions import DatabaseNotInitializedError
 from thoth.user_api import __version__
+from thoth.user_api.adapters import ADAPTERS
+from thoth.user_api.api_v1 import ADVISER_CACHE
+from thoth.user_api.api_v1 import ANALYSIS_WATCHER
+from thoth.user_api.api_v1 import ADVISER_SCHEDULE
+from thoth.user_api.api_v1 import ANALYSES_SCHEDULE
+from thoth.user_api.api_v1 import PROVENANCE_SCHEDULE
+from thoth.user_api.api_v1 import PYTHON_ENVIRONMENTS_SNAPSHOT
+from thoth.user_api.api_v1 import RESULT_DOCUMENT_CACHE
+from thoth.user_api.api_v1 import WORKFLOW_STATUS_CACHE
+from thoth.user_api.api_v1 import post_build_log
+from thoth.user_api.cache import TTLCache
 from thoth.user_api.configuration import Configuration
+from thoth.user_api.image import IMAGE_METADATA_CACHE
 from thoth.user_api.metrics import MetricsValues
+from thoth.user_api.serialization import FAST_JSON
+from thoth.user_api.serialization import FastJSONProvider
 
 
 # Configure global application logging using Thoth's init_logging.
@@ -66,6 +82,18 @@ _LOGGER.debug("DEBUG mode is enabled!")
 _THOTH_API_HTTPS = bool(int(os.getenv("THOTH_API_HTTPS", 1)))
 _REPORT_EXCEPTIONS = bool(int(os.getenv("THOTH_API_REPORT_EXCEPTIONS", 0)))
 _MAX_POST_CONTENT_LENGTH = int(os.getenv("THOTH_MAX_POST_CONTENT_LENGTH", 3 * 1024 * 1024))  # 3MiB by default.
+# Build logs streamed to this endpoint are limited by THOTH_USER_API_BUILD_LOG_STREAM_MAX_LENGTH instead.
+_BUILD_LOG_STREAM_PATH = "/api/v1/build-analysis/log"
+_PAGINATION_HEADERS = "page,entries_count,entries_count_cached,next,next_cursor,page_count,per_page,prev"
+# Read-only catalogue endpoints serving slow-changing data, responses are cached and served with ETag.
+_RESPONSE_CACHE_PATHS = frozenset(
+    {
+        "/api/v1/python-package-index",
+        "/api/v1/python/platform",
+        "/api/v1/python/environment",
+        "/api/v1/python/imports",
+    }
+)
 THOTH_SEARCH_UI_URL = os.getenv("THOTH_SEARCH_UI_URL", "https://thoth-station.ninja/search/")
 
 # Expose for uWSGI.
@@ -85,6 +113,10 @@ app.add_api(
 
 application = app.app
 
+# Requests and responses (including the ones handled by connexion) are decoded and encoded using orjson, if enabled.
+if FAST_JSON:
+    application.json = FastJSONProvider(application)
+
 # create metrics
 metrics = PrometheusMetrics(
     application,
@@ -117,6 +149,20 @@ metrics_cache_hit_adviser_unauthenticated = metrics.info(
     "Thoth User API Adviser Unauthenticated cache hit counter",
 )
 metrics_cache_hit_adviser_unauthenticated.set(metrics_values.metric_cache_hit_adviser_unauth)
+metrics_cache_adviser_l1_hit_ratio = metrics.info(
+    "thoth_user_api_adviser_cache_l1_hit_ratio",
+    "Thoth User API Adviser cache lookups served from worker memory ratio",
+)
+metrics_cache_adviser_l1_hit_ratio.set(metrics_values.metric_cache_adviser_l1_hit_ratio)
+metrics_cache_adviser_l2_hit_ratio = metrics.info(
+    "thoth_user_api_adviser_cache_l2_hit_ratio",
+    "Thoth User API Adviser cache lookups served from cache store ratio",
+)
+metrics_cache_adviser_l2_hit_ratio.set(metrics_values.metric_cache_adviser_l2_hit_ratio)
+metrics_adviser_coalesced_requests = metrics.info(
+    "thoth_user_api_adviser_coalesced_requests_counter",
+    "Thoth User API Adviser requests reusing a run scheduled by a concurrent identical request",
+)
 metrics_cache_hit_provenance_checker_authenticated = metrics.info(
     "thoth_user_api_provenance_checker_authenticated_cache_hit_counter",
     "Thoth User API Provenance Checker Authenticated cache hit counter",
@@ -127,6 +173,70 @@ metrics_cache_hit_provenance_checker_unauthenticated = metrics.info(
     "Thoth User API Provenance Checker Unauthenticated cache hit counter",
 )
 metrics_cache_hit_provenance_checker_unauthenticated.set(metrics_values.metric_cache_hit_provenance_checker_unauth)
+metrics_provenance_checker_coalesced_requests = metrics.info(
+    "thoth_user_api_provenance_checker_coalesced_requests_counter",
+    "Thoth User API Provenance Checker requests reusing a run scheduled by a concurrent identical request",
+)
+metrics_package_extract_coalesced_requests = metrics.info(
+    "thoth_user_api_package_extract_coalesced_requests_counter",
+    "Thoth User API image analysis requests reusing a run scheduled by a concurrent identical request",
+)
+
+# Per-worker image metadata cache statistics, updated on each metrics scrape.
+metrics_image_metadata_cache_hit = metrics.info(
+    "thoth_user_api_image_metadata_cache_hit_counter",
+    "Thoth User API image metadata cache hit counter",
+)
+metrics_image_metadata_cache_miss = metrics.info(
+    "thoth_user_api_image_metadata_cache_miss_counter",
+    "Thoth User API image metadata cache miss counter",
+)
+metrics_image_metadata_cache_eviction = metrics.info(
+    "thoth_user_api_image_metadata_cache_eviction_counter",
+    "Thoth User API image metadata cache eviction counter",
+)
+
+# Per-worker result document cache statistics, updated on each metrics scrape.
+metrics_result_document_cache_hit = metrics.info(
+    "thoth_user_api_result_document_cache_hit_counter",
+    "Thoth User API result document cache hit counter",
+)
+metrics_result_document_cache_miss = metrics.info(
+    "thoth_user_api_result_document_cache_miss_counter",
+    "Thoth User API result document cache miss counter",
+)
+metrics_result_document_cache_size = metrics.info(
+    "thoth_user_api_result_document_cache_size_bytes",
+    "Thoth User API size of serialized result documents cached [B]",
+)
+
+# Per-worker storage adapter connection statistics, updated on each metrics scrape.
+metrics_storage_adapter_connections = metrics.info(
+    "thoth_user_api_storage_adapter_connections_counter",
+    "Thoth User API number of storage adapter connections established",
+)
+metrics_storage_adapter_connect_seconds = metrics.info(
+    "thoth_user_api_storage_adapter_connect_seconds_total",
+    "Thoth User API total time spent connecting storage adapters [s]",
+)
+
+# Per-worker workflow status cache statistics, updated on each metrics scrape.
+metrics_workflow_status_cache_saved_calls = metrics.info(
+    "thoth_user_api_workflow_status_cache_saved_calls_counter",
+    "Thoth User API number of cluster API calls saved by serving workflow status reports from cache",
+)
+
+# Number of analyses clients are waiting for, updated on each metrics scrape.
+metrics_watched_analyses = metrics.info(
+    "thoth_user_api_watched_analyses",
+    "Thoth User API number of analyses watched for clients waiting for their completion",
+)
+
+# Age of the snapshot of Python environments served, updated on each metrics scrape.
+metrics_python_environments_snapshot_age = metrics.info(
+    "thoth_user_api_python_environments_snapshot_age_seconds",
+    "Thoth User API age of the Python environments snapshot [s]",
+)
 
 
 class _GraphDatabaseWrapper:
@@ -147,6 +257,12 @@ class _GraphDatabaseWrapper:
 # (hence the wrapper logic).
 GRAPH = _GraphDatabaseWrapper()
 
+# Serialized responses of catalogue endpoints, one cache per wsgi worker.
+RESPONSE_CACHE = TTLCache(
+    maxsize=Configuration.THOTH_RESPONSE_CACHE_SIZE,
+    ttl=Configuration.THOTH_RESPONSE_CACHE_TTL,
+)
+
 # similarly to DB we create one confluent-kafka-python producer
 PRODUCER = producer.create_producer()
 
@@ -191,12 +307,84 @@ def before_request_callback():
             _LOGGER.exception("Cannot determine database schema as database is not initialized: %s", str(exc))
             _API_GAUGE_METRIC.set(0)
 
+        metrics_image_metadata_cache_hit.set(IMAGE_METADATA_CACHE.hits)
+        metrics_image_metadata_cache_miss.set(IMAGE_METADATA_CACHE.misses)
+        metrics_image_metadata_cache_eviction.set(IMAGE_METADATA_CACHE.evictions)
+        metrics_result_document_cache_hit.set(RESULT_DOCUMENT_CACHE.hits)
+        metrics_result_document_cache_miss.set(RESULT_DOCUMENT_CACHE.misses)
+        metrics_result_document_cache_size.set(RESULT_DOCUMENT_CACHE.size)
+        metrics_storage_adapter_connections.set(ADAPTERS.connections_count)
+        metrics_storage_adapter_connect_seconds.set(ADAPTERS.connect_seconds_total)
+        metrics_values.update_adviser_cache_hit_ratio_metric(*ADVISER_CACHE.hit_ratios())
+        metrics_cache_adviser_l1_hit_ratio.set(metrics_values.metric_cache_adviser_l1_hit_ratio)
+        metrics_cache_adviser_l2_hit_ratio.set(metrics_values.metric_cache_adviser_l2_hit_ratio)
+        metrics_adviser_coalesced_requests.set(ADVISER_SCHEDULE.coalesced_count)
+        metrics_provenance_checker_coalesced_requests.set(PROVENANCE_SCHEDULE.coalesced_count)
+        metrics_package_extract_coalesced_requests.set(ANALYSES_SCHEDULE.coalesced_count)
+        metrics_watched_analyses.set(len(ANALYSIS_WATCHER))
+        metrics_workflow_status_cache_saved_calls.set(WORKFLOW_STATUS_CACHE.saved_calls)
+        snapshot_age = PYTHON_ENVIRONMENTS_SNAPSHOT.age()
+        if snapshot_age is not None:
+            metrics_python_environments_snapshot_age.set(snapshot_age)
+
     if method == "POST":
-        if request.content_length is not None and request.content_length > _MAX_POST_CONTENT_LENGTH:
+        if (
+            request.path != _BUILD_LOG_STREAM_PATH
+            and request.content_length is not None
+            and request.content_length > _MAX_POST_CONTENT_LENGTH
+        ):
             response = make_response(jsonify(error=f"Input exceeded {_MAX_POST_CONTENT_LENGTH} bytes allowed"), 400)
             abort(response)
 
 
+def _response_cache_key() -> Optional[str]:
+    """Get key under which the response to the current request is cached, None if not cacheable."""
+    if request.method != "GET" or request.path not in _RESPONSE_CACHE_PATHS:
+        return None
+
+    return request.full_path
+
+
+@application.before_request
+def serve_cached_response():
+    """Serve response of a catalogue endpoint from cache, if available."""
+    cache_key = _response_cache_key()
+    if cache_key is None:
+        return None
+
+    cached = RESPONSE_CACHE.get(cache_key)
+    if cached is None:
+        return None
+
+    body, mimetype, etag = cached
+    response = application.response_class(body, status=200, mimetype=mimetype)
+    response.set_etag(etag)
+    return response
+
+
+@application.after_request
+def cache_response(response):
+    """Store response of a catalogue endpoint in cache and handle conditional requests."""
+    cache_key = _response_cache_key()
+    if cache_key is None or response.status_code != 200 or response.direct_passthrough:
+        return response
+
+    etag, _ = response.get_etag()
+    if etag is None:
+        # Not served from cache.
+        body = response.get_data()
+        etag = hashlib.sha256(body).hexdigest()
+        response.set_etag(etag)
+        RESPONSE_CACHE.set(cache_key, (body, response.mimetype, etag))
+
+    response.headers["Cache-Control"] = f"public, max-age={Configuration.THOTH_RESPONSE_CACHE_TTL}"
+    return response.make_conditional(request)
+
+
+# Not part of the OpenAPI specification - connexion reads whole request bodies into memory.
+application.add_url_rule(_BUILD_LOG_STREAM_PATH, view_func=post_build_log, methods=["POST"])
+
+
 @app.route("/")
 def base_url():
     """Redirect to UI by default."""
@@ -332,7 +520,7 @@ def apply_headers(response):
     response.headers["X-Thoth-Search-Ui-Url"] = THOTH_SEARCH_UI_URL
     if "page" in response.headers:
         # Expose headers to users.
-        response.headers["Access-Control-Expose-Headers"] = "page,entries_count,next,page_count,per_page,prev"
+        response.headers["Access-Control-Expose-Headers"] = _PAGINATION_HEADERS
     return response
 
 
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Keyset (cursor) based pagination on top of graph database queries.
+
+Instead of skipping rows using OFFSET, each page continues right after the sort key of the last row
+returned on the previous page, so deep pages are as cheap as the first one.
+"""
+
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from sqlalchemy import tuple_
+from thoth.common import map_os_name
+from thoth.common.helpers import format_datetime
+from thoth.common.helpers import normalize_os_version
+from thoth.storages import GraphDatabase
+from thoth.storages.graph.models import PackageExtractRun
+from thoth.storages.graph.models import PythonPackageVersion
+from thoth.storages.graph.models import SoftwareEnvironment
+
+from .compat import construct_python_package_version_names_query
+from .compat import construct_software_environments_query
+from .compat import session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def encode_cursor(key: List[Any]) -> str:
+    """Encode sort key of the last row on a page into an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor into sort key of the last row on the previous page, raise ValueError if invalid."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor supplied: {cursor!r}") from exc
+
+    if not isinstance(key, list):
+        raise ValueError(f"Invalid cursor supplied: {cursor!r}")
+
+    return key
+
+
+def get_python_package_names_page(
+    graph: GraphDatabase,
+    *,
+    after: Optional[List[Any]],
+    count: int,
+    os_name: Optional[str] = None,
+    os_version: Optional[str] = None,
+    python_version: Optional[str] = None,
+    like: Optional[str] = None,
+) -> Tuple[List[str], Optional[List[Any]]]:
+    """Retrieve sorted distinct Python package names following the given sort key, return also key for next page."""
+    if after is not None and (len(after) != 1 or not isinstance(after[0], str)):
+        raise ValueError("Invalid cursor supplied for listing Python packages")
+
+    os_name = map_os_name(os_name)
+    os_version = normalize_os_version(os_name, os_version)
+    with session_scope(graph) as session:
+        query = construct_python_package_version_names_query(
+            graph, session, os_name=os_name, os_version=os_version, python_version=python_version, like=like
+        )
+
+        if after is not None:
+            query = query.filter(PythonPackageVersion.package_name > after[0])
+
+        # Query one more row to find out whether there is a next page.
+        query = query.order_by(PythonPackageVersion.package_name).distinct().limit(count + 1)
+        result = [item[0] for item in query.all()]
+
+    if len(result) <= count:
+        return result, None
+
+    result = result[:count]
+    return result, [result[-1]]
+
+
+def get_software_environments_page(
+    graph: GraphDatabase,
+    *,
+    after: Optional[List[Any]],
+    count: int,
+    **filters: Optional[str],
+) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+    """Retrieve internal software environments following the given sort key, return also key for next page.
+
+    The order is the same as in GraphDatabase.get_software_environments_all (the most recent first), ties are broken
+    by package-extract run id.
+    """
+    if after is not None:
+        if len(after) != 2 or not isinstance(after[0], str) or not isinstance(after[1], int):
+            raise ValueError("Invalid cursor supplied for listing container images")
+        after = [datetime.fromisoformat(after[0]), after[1]]
+
+    with session_scope(graph) as session:
+        query = construct_software_environments_query(graph, session, SoftwareEnvironment, **filters)
+        query = query.join(PackageExtractRun)
+
+        if after is not None:
+            query = query.filter(tuple_(PackageExtractRun.datetime, PackageExtractRun.id) < tuple_(*after))
+
+        query = query.order_by(PackageExtractRun.datetime.desc(), PackageExtractRun.id.desc())
+        query = query.with_entities(
+            SoftwareEnvironment.cuda_version,
+            SoftwareEnvironment.env_image_name,
+            SoftwareEnvironment.env_image_tag,
+            SoftwareEnvironment.environment_name,
+            SoftwareEnvironment.environment_type,
+            SoftwareEnvironment.image_sha,
+            SoftwareEnvironment.os_name,
+            SoftwareEnvironment.os_version,
+            SoftwareEnvironment.python_version,
+            SoftwareEnvironment.thoth_image_name,
+            SoftwareEnvironment.thoth_image_version,
+            PackageExtractRun.analysis_document_id,
+            PackageExtractRun.datetime,
+            PackageExtractRun.id,
+        )
+        # Query one more row to find out whether there is a next page.
+        rows = query.limit(count + 1).all()
+
+    result = []
+    for r in rows[:count]:
+        result.append(
+            {
+                "cuda_version": r[0],
+                "datetime": format_datetime(r[12]),
+                "env_image_name": r[1],
+                "env_image_tag": r[2],
+                "environment_name": r[3],
+                "environment_type": r[4],
+                "image_sha": r[5],
+                "os_name": r[6],
+                "os_version": r[7],
+                "package_extract_document_id": r[11],
+                "python_version": r[8],
+                "thoth_image_name": r[9],
+                "thoth_image_version": r[10],
+            }
+        )
+
+    if len(rows) <= count:
+        return result, None
+
+    last = rows[count - 1]
+    return result, [last[12].isoformat(), last[13]]
@@ -22,7 +22,12 @@ And also filters the webhooks that Kebechet doesn't support to prevent unnecessa
 """
 
 import logging
+from datetime import datetime
+from sqlalchemy import case
 from thoth.storages import GraphDatabase
+from thoth.storages.graph.models import KebechetGithubAppInstallations
+from thoth.user_api.compat import session_scope
+from thoth.user_api.configuration import Configuration
 from typing import Any
 from typing import Dict
 from typing import List
@@ -37,12 +42,32 @@ _BOT_BRANCH = "refs/heads/kebechet-"
 _IGNORED_ACTIONS = frozenset({"suspend", "unsuspend", "new_permissions_accepted"})
 
 
+def _validate_installation_repo(repo: Any) -> Optional[str]:
+    """Validate a repository entry of an installation event, return error message if invalid."""
+    if not isinstance(repo, dict):
+        return "Repository entry is not an object"
+
+    full_name = repo.get("full_name")
+    if not isinstance(full_name, str) or len(full_name.split("/")) != 2 or not all(full_name.split("/")):
+        return "Repository full_name is not in form of namespace/repository"
+    if not isinstance(repo.get("name"), str) or not repo["name"]:
+        return "Repository name is missing"
+    if not isinstance(repo.get("private"), bool):
+        return "Repository private flag is missing"
+    if repo.get("id") is None:
+        return "Repository id is missing"
+
+    return None
+
+
 class PayloadProcess:
     """Helper methods that handle incoming payloads."""
 
-    def __init__(self):
-        """Init Method."""
-        pass
+    def __init__(self, graph: GraphDatabase) -> None:
+        """Init Method, the graph adapter passed is shared to reuse its connection pool."""
+        self.graph = graph
+        # Outcome for each repository of the last installation event processed.
+        self.installation_report: Optional[List[Dict[str, Any]]] = None
 
     def process(self, webhook_payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -94,31 +119,98 @@ class PayloadProcess:
                     return None
         return webhook_payload
 
-    @staticmethod
-    def _install_event(install_repos: List[Dict[str, Any]]) -> None:
-        """Handle Github App install webhooks."""
-        graph = GraphDatabase()
-        graph.connect()
-        for repo in install_repos:
-            try:
-                _ = graph.create_github_app_installation(
-                    slug=repo.get("full_name"),
-                    repo_name=repo.get("name"),
-                    private=repo.get("private"),
-                    installation_id=str(repo.get("id")),
-                )
-            except Exception as exc:
-                _LOGGER.error(f"The repo couldn't be added to the database. Repo details - {repo} Exception - {exc}")
-
-    @staticmethod
-    def _remove_event(uninstall_repos: List[Dict[str, Any]]) -> None:
-        """Handle Github App remove webhooks."""
-        graph = GraphDatabase()
-        graph.connect()
-        for repo in uninstall_repos:
+    def _install_event(self, install_repos: List[Dict[str, Any]]) -> None:
+        """Handle Github App install webhooks, repositories are validated and stored in chunks."""
+        report: List[Dict[str, Any]] = []
+        valid_repos: Dict[str, Dict[str, Any]] = {}
+        for repo in install_repos or []:
+            error = _validate_installation_repo(repo)
+            if error:
+                slug = repo.get("full_name") if isinstance(repo, dict) else None
+                report.append({"slug": slug, "status": "invalid", "error": error})
+                continue
+
+            valid_repos[repo["full_name"]] = repo
+
+        slugs = list(valid_repos.keys())
+        chunk_size = Configuration.THOTH_INSTALLATION_CHUNK_SIZE
+        for idx in range(0, len(slugs), chunk_size):
+            chunk = {slug: valid_repos[slug] for slug in slugs[idx : idx + chunk_size]}
             try:
-                status = graph.update_kebechet_github_installations_on_is_active(slug=repo.get("full_name"))
-                if not status:
-                    _LOGGER.error(f"Failed to deactivate repo - {repo}")
+                report.extend(self._store_installation_chunk(chunk))
             except Exception as exc:
-                _LOGGER.error(f"Error encoutered while deactivating repository. Exception - {exc}")
+                _LOGGER.error(f"The repos couldn't be added to the database. Repos - {list(chunk)} Exception - {exc}")
+                report.extend({"slug": slug, "status": "failed", "error": str(exc)} for slug in chunk)
+
+        self.installation_report = report
+
+    def _store_installation_chunk(self, repos: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create new installations or reactivate uninstalled ones in one transaction."""
+        report = []
+        with session_scope(self.graph) as session:
+            existing: Dict[str, int] = {}
+            for id_, slug in (
+                session.query(KebechetGithubAppInstallations.id, KebechetGithubAppInstallations.slug)
+                .filter(KebechetGithubAppInstallations.slug.in_(list(repos.keys())))
+                .order_by(KebechetGithubAppInstallations.id)
+            ):
+                existing.setdefault(slug, id_)
+
+            updates: Dict[int, Dict[str, Any]] = {}
+            inserts = []
+            for slug, repo in repos.items():
+                if slug in existing:
+                    updates[existing[slug]] = repo
+                    report.append({"slug": slug, "status": "reactivated"})
+                else:
+                    inserts.append(
+                        {
+                            "slug": slug,
+                            "repo_name": repo["name"],
+                            "private": repo["private"],
+                            "installation_id": str(repo["id"]),
+                            "is_active": True,
+                            "last_run": datetime.utcnow(),
+                        }
+                    )
+                    report.append({"slug": slug, "status": "created"})
+
+            # One multi-row statement per chunk for each - bulk_*_mappings would issue one statement per row.
+            if updates:
+                session.query(KebechetGithubAppInstallations).filter(
+                    KebechetGithubAppInstallations.id.in_(list(updates))
+                ).update(
+                    {
+                        "installation_id": case(
+                            {id_: str(repo["id"]) for id_, repo in updates.items()},
+                            value=KebechetGithubAppInstallations.id,
+                        ),
+                        "private": case(
+                            {id_: repo["private"] for id_, repo in updates.items()},
+                            value=KebechetGithubAppInstallations.id,
+                        ),
+                        "is_active": True,
+                    },
+                    synchronize_session=False,
+                )
+            if inserts:
+                session.execute(KebechetGithubAppInstallations.__table__.insert().values(inserts))
+
+        return report
+
+    def _remove_event(self, uninstall_repos: List[Dict[str, Any]]) -> None:
+        """Handle Github App remove webhooks, all the repositories are deactivated in one transaction."""
+        slugs = {repo.get("full_name") for repo in uninstall_repos}
+        try:
+            with session_scope(self.graph) as session:
+                instances = session.query(KebechetGithubAppInstallations).filter(
+                    KebechetGithubAppInstallations.slug.in_(list(slugs))
+                )
+                found = {slug for (slug,) in instances.with_entities(KebechetGithubAppInstallations.slug)}
+                instances.update({"is_active": False}, synchronize_session=False)
+        except Exception as exc:
+            _LOGGER.error(f"Error encoutered while deactivating repositories. Exception - {exc}")
+            return
+
+        for slug in slugs - found:
+            _LOGGER.error(f"Failed to deactivate repo - {slug}")
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A minimal in-process client for Docker Registry v2 / OCI distribution API used for image inspection.
+
+The output mimics output of `skopeo inspect` so that it can be used as a drop-in replacement
+without spawning a process for each request.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import TTLCache
+from .configuration import Configuration
+from .exceptions import ImageAuthenticationRequiredError
+from .exceptions import ImageError
+from .exceptions import ImageInvalidCredentialsError
+from .exceptions import ImageInvalidReferenceFormatError
+from .exceptions import ImageManifestUnknownError
+
+_LOGGER = logging.getLogger(__name__)
+
+_DOCKER_HUB_REGISTRY = "docker.io"
+_DOCKER_HUB_ENDPOINT = "registry-1.docker.io"
+_DEFAULT_TAG = "latest"
+_REPOSITORY_RE = re.compile(r"^[a-z0-9]+(?:(?:[._]|__|-+)[a-z0-9]+)*(?:/[a-z0-9]+(?:(?:[._]|__|-+)[a-z0-9]+)*)*$")
+_TAG_RE = re.compile(r"^[\w][\w.-]{0,127}$")
+_DIGEST_RE = re.compile(r"^[a-z0-9]+(?:[.+_-][a-z0-9]+)*:[a-zA-Z0-9=_-]+$")
+_CHALLENGE_PARAM_RE = re.compile(r'(\w+)="([^"]*)"')
+
+_MEDIA_TYPE_MANIFEST_LIST = "application/vnd.docker.distribution.manifest.list.v2+json"
+_MEDIA_TYPE_OCI_INDEX = "application/vnd.oci.image.index.v1+json"
+_MANIFEST_ACCEPT = ", ".join(
+    (
+        "application/vnd.docker.distribution.manifest.v2+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        _MEDIA_TYPE_MANIFEST_LIST,
+        _MEDIA_TYPE_OCI_INDEX,
+    )
+)
+
+# Architecture and operating system picked from manifest lists, the same defaults as skopeo uses on our nodes.
+_DEFAULT_ARCHITECTURE = "amd64"
+_DEFAULT_OS = "linux"
+
+# Bearer tokens are cached per worker to avoid an authentication round-trip for each inspection.
+_TOKEN_CACHE = TTLCache(maxsize=256, ttl=60)
+
+
+def _create_session() -> requests.Session:
+    """Create an HTTP session with connection pooling used for talking to registries."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=Configuration.THOTH_REGISTRY_POOL_CONNECTIONS,
+        pool_maxsize=Configuration.THOTH_REGISTRY_POOL_MAXSIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# One session per wsgi worker, connections are reused across requests.
+_SESSION = _create_session()
+
+
+def parse_image_reference(image_name: str) -> Tuple[str, str, str]:
+    """Parse the given image reference into registry, repository and tag or digest."""
+    reference = image_name
+    if reference.startswith("docker://"):
+        reference = reference[len("docker://") :]
+
+    if not reference or reference != reference.strip():
+        raise ImageInvalidReferenceFormatError("The image reference format specified is invalid.")
+
+    digest = None
+    if "@" in reference:
+        reference, digest = reference.split("@", maxsplit=1)
+        if not _DIGEST_RE.match(digest):
+            raise ImageInvalidReferenceFormatError("The image reference format specified is invalid.")
+
+    tag = None
+    last_slash = reference.rfind("/")
+    last_colon = reference.rfind(":")
+    if last_colon > last_slash:
+        reference, tag = reference[:last_colon], reference[last_colon + 1 :]
+        if not _TAG_RE.match(tag):
+            raise ImageInvalidReferenceFormatError("The image reference format specified is invalid.")
+
+    parts = reference.split("/", maxsplit=1)
+    if len(parts) == 2 and ("." in parts[0] or ":" in parts[0] or parts[0] == "localhost"):
+        registry, repository = parts
+    else:
+        registry, repository = _DOCKER_HUB_REGISTRY, reference
+
+    if registry == _DOCKER_HUB_REGISTRY and "/" not in repository:
+        repository = f"library/{repository}"
+
+    if not _REPOSITORY_RE.match(repository):
+        raise ImageInvalidReferenceFormatError("The image reference format specified is invalid.")
+
+    return registry, repository, digest or tag or _DEFAULT_TAG
+
+
+class _RegistryClient:
+    """Talk to one repository in a container image registry."""
+
+    def __init__(
+        self,
+        registry: str,
+        repository: str,
+        *,
+        registry_user: Optional[str] = None,
+        registry_password: Optional[str] = None,
+        verify_tls: bool = True,
+    ) -> None:
+        """Initialize client for the given repository."""
+        self.registry = registry
+        self.repository = repository
+        self.verify_tls = verify_tls
+        self._auth = (registry_user, registry_password) if registry_user and registry_password else None
+        self._token: Optional[str] = None
+        endpoint = _DOCKER_HUB_ENDPOINT if registry == _DOCKER_HUB_REGISTRY else registry
+        self._base_url = f"https://{endpoint}/v2/{repository}"
+
+    def _authenticate(self, challenge: str) -> None:
+        """Obtain credentials based on WWW-Authenticate challenge sent by the registry."""
+        scheme, _, params_str = challenge.partition(" ")
+        if scheme.lower() == "basic":
+            if self._auth is None:
+                raise ImageAuthenticationRequiredError(
+                    "There is required authentication in order to pull image and image details"
+                )
+            return
+
+        params = dict(_CHALLENGE_PARAM_RE.findall(params_str))
+        realm = params.pop("realm", None)
+        if scheme.lower() != "bearer" or not realm:
+            raise ImageError(f"Unsupported authentication challenge sent by registry: {challenge!r}")
+
+        params.setdefault("scope", f"repository:{self.repository}:pull")
+        credentials_fingerprint = (
+            hashlib.sha256(":".join(self._auth).encode()).hexdigest() if self._auth is not None else None
+        )
+        cache_key = (realm, params.get("service"), params["scope"], credentials_fingerprint)
+        token = _TOKEN_CACHE.get(cache_key)
+        if token is not None:
+            self._token = token
+            return
+
+        response = _SESSION.get(
+            realm,
+            params=params,
+            auth=self._auth,
+            verify=self.verify_tls,
+            timeout=Configuration.THOTH_REGISTRY_TIMEOUT,
+        )
+        if response.status_code == 401:
+            if self._auth is not None:
+                raise ImageInvalidCredentialsError(
+                    "There was an error accessing the image as the username/password provided was invalid"
+                )
+            raise ImageAuthenticationRequiredError(
+                "There is required authentication in order to pull image and image details"
+            )
+        response.raise_for_status()
+
+        content = response.json()
+        self._token = content.get("token") or content.get("access_token")
+        if not self._token:
+            raise ImageError("No token obtained from registry authentication service")
+
+        # Keep some slack so that a token does not expire in the middle of inspection.
+        _TOKEN_CACHE.set(cache_key, self._token, ttl=max(int(content.get("expires_in", 60)) - 10, 0))
+
+    def _get(self, path: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Perform an authenticated GET request to the registry API."""
+        url = path if path.startswith(("https://", "http://")) else f"{self._base_url}/{path}"
+        for _ in range(2):
+            request_headers = dict(headers or {})
+            auth = None
+            if self._token:
+                request_headers["Authorization"] = f"Bearer {self._token}"
+            elif self._auth:
+                auth = self._auth
+
+            response = _SESSION.get(
+                url,
+                headers=request_headers,
+                auth=auth,
+                verify=self.verify_tls,
+                timeout=Configuration.THOTH_REGISTRY_TIMEOUT,
+            )
+            if response.status_code != 401 or self._token:
+                break
+
+            self._authenticate(response.headers.get("WWW-Authenticate", ""))
+            if not self._token:
+                # Basic authentication was already sent.
+                break
+
+        if response.status_code == 401:
+            if self._auth is not None:
+                raise ImageInvalidCredentialsError(
+                    "There was an error accessing the image as the username/password provided was invalid"
+                )
+            raise ImageAuthenticationRequiredError(
+                "There is required authentication in order to pull image and image details"
+            )
+
+        return response
+
+    def get_manifest(self, reference: str) -> Tuple[Dict[str, Any], str]:
+        """Retrieve manifest for the given tag or digest, return it together with its digest."""
+        response = self._get(f"manifests/{reference}", headers={"Accept": _MANIFEST_ACCEPT})
+        if response.status_code == 404:
+            raise ImageManifestUnknownError("Unknown manifest for the given image")
+        response.raise_for_status()
+
+        digest = response.headers.get("Docker-Content-Digest") or (
+            "sha256:" + hashlib.sha256(response.content).hexdigest()
+        )
+        return response.json(), digest
+
+    def get_blob(self, digest: str) -> Dict[str, Any]:
+        """Retrieve a JSON blob (e.g. image configuration) stored in the repository."""
+        response = self._get(f"blobs/{digest}")
+        response.raise_for_status()
+        return response.json()
+
+    def get_tags(self) -> List[str]:
+        """List all tags available in the repository."""
+        tags: List[str] = []
+        path: Optional[str] = "tags/list"
+        while path:
+            response = self._get(path)
+            response.raise_for_status()
+            tags.extend(response.json().get("tags") or [])
+
+            next_link = response.links.get("next", {}).get("url")
+            if next_link and next_link.startswith("/"):
+                scheme_host = self._base_url[: self._base_url.index("/v2/")]
+                next_link = scheme_host + next_link
+            path = next_link
+
+        return tags
+
+    def use_plain_http(self) -> None:
+        """Fall back to plain HTTP, used only if TLS verification is turned off (as skopeo does)."""
+        self._base_url = "http://" + self._base_url[len("https://") :]
+
+
+def _select_manifest(manifest_list: Dict[str, Any]) -> str:
+    """Select digest of the platform specific manifest from a manifest list or an image index."""
+    for entry in manifest_list.get("manifests") or []:
+        platform = entry.get("platform") or {}
+        if platform.get("architecture") == _DEFAULT_ARCHITECTURE and platform.get("os") == _DEFAULT_OS:
+            return entry["digest"]
+
+    raise ImageManifestUnknownError("Unknown manifest for the given image")
+
+
+def _inspect(client: _RegistryClient, reference: str) -> Dict[str, Any]:
+    """Gather image information in the same form as skopeo does."""
+    manifest, digest = client.get_manifest(reference)
+    if manifest.get("mediaType") in (_MEDIA_TYPE_MANIFEST_LIST, _MEDIA_TYPE_OCI_INDEX) or (
+        "manifests" in manifest and "config" not in manifest
+    ):
+        manifest, _ = client.get_manifest(_select_manifest(manifest))
+
+    if "config" not in manifest:
+        # Schema 1 manifests are deprecated and not supported by this client.
+        raise ImageError(f"Unsupported manifest format for image in repository {client.repository!r}")
+
+    config = client.get_blob(manifest["config"]["digest"])
+    container_config = config.get("config") or {}
+
+    name = f"{client.registry}/{client.repository}"
+    return {
+        "Name": name,
+        "Tag": reference if ":" not in reference else None,
+        "Digest": digest,
+        "RepoTags": client.get_tags(),
+        "Created": config.get("created"),
+        "DockerVersion": config.get("docker_version", ""),
+        "Labels": container_config.get("Labels"),
+        "Architecture": config.get("architecture"),
+        "Os": config.get("os"),
+        "Layers": [layer["digest"] for layer in manifest.get("layers") or []],
+        "Env": container_config.get("Env"),
+    }
+
+
+def registry_inspect(
+    image_name: str,
+    *,
+    registry_user: Optional[str] = None,
+    registry_password: Optional[str] = None,
+    verify_tls: bool = True,
+) -> Dict[str, Any]:
+    """Inspect the given image by talking to the registry directly, output matches `skopeo inspect` keys."""
+    registry, repository, reference = parse_image_reference(image_name)
+    client = _RegistryClient(
+        registry,
+        repository,
+        registry_user=registry_user,
+        registry_password=registry_password,
+        verify_tls=verify_tls,
+    )
+
+    try:
+        try:
+            return _inspect(client, reference)
+        except (requests.exceptions.SSLError, requests.exceptions.ConnectionError):
+            if verify_tls:
+                raise
+
+            client.use_plain_http()
+            return _inspect(client, reference)
+    except requests.exceptions.SSLError as exc:
+        _LOGGER.warning("TLS verification failed when inspecting image %r: %s", image_name, str(exc))
+        raise ImageAuthenticationRequiredError(
+            "There was an error with x509 certification check: certificate signed by unknown authority"
+        ) from exc
+    except (requests.exceptions.RequestException, ValueError) as exc:
+        _LOGGER.error("An unhandled error occurred during extraction of image %r: %s", image_name, str(exc))
+        raise ImageError(
+            "There was an error when extracting image information, please contact administrator for more details"
+        ) from exc
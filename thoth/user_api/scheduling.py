@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Deduplication of identical requests scheduling workflows."""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import Type
+
+from thoth.storages.exceptions import CacheMissError
+
+from .adapters import ADAPTERS
+from .cache import RecordCache
+from .cache import timestamp_now
+from .configuration import Configuration
+
+_LOGGER = logging.getLogger(__name__)
+
+_ScheduleResult = Tuple[Dict[str, Any], int]
+_RunResult = Tuple[Dict[str, Any], int, bool]
+
+
+class _Call:
+    """A call in progress, shared by all the callers of the same key in a worker."""
+
+    def __init__(self) -> None:
+        """Initialize a call which has not finished yet."""
+        self.done = threading.Event()
+        self.result: Optional[_RunResult] = None
+        self.exc: Optional[BaseException] = None
+
+
+class ScheduleOnce:
+    """Schedule a workflow at most once for concurrent identical requests keyed by their cache record id.
+
+    Within a worker, concurrent callers of the same key wait for the first one (single-flight) and reuse its
+    response. Across workers, the caller scheduling the workflow holds a lock kept in the cache store next to the
+    cache record; callers in other workers wait until the cache record is stored and reuse it. Records carrying
+    a timestamp are reused only if they did not expire, the same way as in the API handlers. The object store
+    offers no compare-and-set, the lock is taken by writing it and reading it back - two workers taking the lock at
+    the very same moment can still both schedule. Locks expire so that a crashed worker never blocks scheduling.
+
+    Locks are records stored as "<key>.lock" documents in the cache store, they share its namespace with cache
+    records - anything listing or iterating the cache store sees them as well. Cache store adapters offer no way to
+    delete records, locks are released by deleting their objects using the Ceph adapter (adapter.ceph.delete).
+    """
+
+    _LOCK_SUFFIX = ".lock"
+
+    def __init__(
+        self,
+        adapter_class: Type[Any],
+        *,
+        records: Optional[RecordCache] = None,
+        lock_ttl: float = Configuration.THOTH_SCHEDULE_LOCK_TTL,
+        wait_timeout: float = Configuration.THOTH_SCHEDULE_LOCK_WAIT_TIMEOUT,
+        poll_interval: float = 0.25,
+    ) -> None:
+        """Initialize deduplication on top of the given cache store adapter class.
+
+        Cache records are looked up using the given in-memory cache of records, if any.
+        """
+        self.adapter_class = adapter_class
+        self.records = records
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.coalesced_count = 0
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, schedule: Callable[[], _ScheduleResult]) -> _RunResult:
+        """Schedule using the given callable unless an identical request is being scheduled.
+
+        The callable is responsible for storing the cache record on success. Return response, status code and a
+        flag whether the response was reused from an identical request - the response carries analysis_id then.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        assert call is not None
+        if not leader:
+            call.done.wait()
+            with self._lock:
+                self.coalesced_count += 1
+
+            if call.exc is not None:
+                raise call.exc
+
+            assert call.result is not None
+            response, status_code, _ = call.result
+            return dict(response), status_code, status_code == 202
+
+        try:
+            call.result = self._run_locked(key, schedule)
+        except BaseException as exc:
+            call.exc = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+        return call.result
+
+    def _run_locked(self, key: str, schedule: Callable[[], _ScheduleResult]) -> _RunResult:
+        """Schedule holding the lock in the cache store, or reuse record stored by the lock holder."""
+        token = self._acquire(key)
+        if token is None:
+            record = self._wait_for_record(key)
+            if record is not None:
+                with self._lock:
+                    self.coalesced_count += 1
+                return {"analysis_id": record["analysis_id"]}, 202, True
+
+            _LOGGER.warning("No cache record stored for %r by the lock holder, scheduling", key)
+        else:
+            # The record might have been stored since the caller looked it up.
+            record = self._retrieve_fresh_record(key)
+            if record is not None:
+                self._release(key, token)
+                with self._lock:
+                    self.coalesced_count += 1
+                return {"analysis_id": record["analysis_id"]}, 202, True
+
+        try:
+            response, status_code = schedule()
+        finally:
+            if token is not None:
+                self._release(key, token)
+
+        return response, status_code, False
+
+    def _retrieve_fresh_record(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve cache record for the given key if it did not expire."""
+        try:
+            if self.records is not None:
+                record = self.records.retrieve_document_record(key)
+            else:
+                record = ADAPTERS.get(self.adapter_class).retrieve_document_record(key)
+        except CacheMissError:
+            return None
+
+        if "timestamp" in record and record["timestamp"] + Configuration.THOTH_CACHE_EXPIRATION <= timestamp_now():
+            return None
+
+        return record
+
+    def _lock_is_held(self, key: str) -> bool:
+        """Check whether there is a valid lock kept for the given key."""
+        try:
+            lock = ADAPTERS.get(self.adapter_class).retrieve_document_record(key + self._LOCK_SUFFIX)
+        except CacheMissError:
+            return False
+
+        return lock["expires_at"] > timestamp_now()
+
+    def _acquire(self, key: str) -> Optional[str]:
+        """Take the lock for the given key, return token identifying the lock holder or None if held by others."""
+        if self._lock_is_held(key):
+            return None
+
+        adapter = ADAPTERS.get(self.adapter_class)
+        token = uuid.uuid4().hex
+        lock_id = key + self._LOCK_SUFFIX
+        adapter.store_document_record(lock_id, {"owner": token, "expires_at": timestamp_now() + self.lock_ttl})
+
+        try:
+            owner = adapter.retrieve_document_record(lock_id)["owner"]
+        except CacheMissError:
+            # Released by a concurrent holder in the meantime, nothing to compete with.
+            return token
+
+        return token if owner == token else None
+
+    def _release(self, key: str, token: str) -> None:
+        """Release the lock for the given key if still held by the given token."""
+        adapter = ADAPTERS.get(self.adapter_class)
+        lock_id = key + self._LOCK_SUFFIX
+        try:
+            if adapter.retrieve_document_record(lock_id)["owner"] == token:
+                adapter.ceph.delete(lock_id)
+        except CacheMissError:
+            pass
+        except Exception:
+            _LOGGER.exception("Failed to release lock %r, it will expire in %d seconds", lock_id, self.lock_ttl)
+
+    def _wait_for_record(self, key: str) -> Optional[Dict[str, Any]]:
+        """Wait for the lock holder to store the cache record, return None if not stored."""
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            record = self._retrieve_fresh_record(key)
+            if record is not None:
+                return record
+
+            if time.monotonic() >= deadline or not self._lock_is_held(key):
+                # The lock holder might have stored the record just before releasing the lock.
+                return self._retrieve_fresh_record(key)
+
+            time.sleep(self.poll_interval)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Decoding and encoding of JSON documents and of requests and responses, using orjson if installed."""
+
+import json
+import logging
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Union
+
+from flask.json.provider import DefaultJSONProvider
+
+from .configuration import Configuration
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_LOGGER = logging.getLogger(__name__)
+
+if Configuration.THOTH_JSON_FAST and orjson is None:
+    _LOGGER.info("Package orjson is not installed, using json from standard library")
+
+# Whether orjson is used to decode and encode documents.
+FAST_JSON = bool(Configuration.THOTH_JSON_FAST and orjson is not None)
+
+# Numbers orjson does not decode exactly - it decodes integers wider than 64 bits as floats. Runs of digits are
+# looked up by mapping all digits to zero, which is considerably faster than a regular expression.
+_DIGITS_TO_ZERO = bytes.maketrans(b"0123456789", b"0" * 10)
+_LONG_NUMBER = b"0" * 19
+
+
+def _has_long_number(data: Union[bytes, str]) -> bool:
+    """Check whether the given JSON can contain a number wider than 64 bits, false positives are allowed."""
+    if isinstance(data, str):
+        data = data.encode(errors="surrogatepass")
+
+    return _LONG_NUMBER in data.translate(_DIGITS_TO_ZERO)
+
+
+def _orjson_exact(obj: Any) -> bool:
+    """Check whether orjson encodes the given object to the same text as the standard library (up to escaping).
+
+    Floats are formatted differently (e.g. 1e22 versus 1e+22; NaN and infinity are encoded as null), keys other than
+    strings are sorted differently and objects converted by a default handler are not known in advance.
+    """
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            for key, value in item.items():
+                if not isinstance(key, str):
+                    return False
+                stack.append(value)
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif item is not None and (isinstance(item, float) or not isinstance(item, (str, int))):
+            return False
+
+    return True
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document, the result is the same as the one of json.loads."""
+    if FAST_JSON:
+        if not _has_long_number(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # Constants such as NaN or lone surrogates, let the standard library decide.
+                pass
+
+    return json.loads(data)
+
+
+def dumps_document(document: Any) -> bytes:
+    """Encode a result document with sorted keys and indentation, followed by a newline.
+
+    The encoding is the one CephStore.dict2blob uses to store documents (plus the newline), so documents served as
+    stored and documents decoded, redacted and encoded again are encoded the same way, regardless of FAST_JSON.
+    It is also the encoding connexion uses for handler responses, see FastJSONProvider.
+    """
+    return (json.dumps(document, sort_keys=True, separators=(",", ": "), indent=2) + "\n").encode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider of the Flask application (used by connexion as well) decoding and encoding using orjson.
+
+    Arguments orjson does not support are handled by the standard library, the same way as DefaultJSONProvider
+    does. Decoded values are the same as the ones decoded by the standard library so that digests computed on
+    request parameters do not change. Encoded output is byte-equal to the one of DefaultJSONProvider: objects
+    holding values orjson encodes differently (floats, keys other than strings, types converted by default handler)
+    and output with non-ASCII characters or DEL (kept escaped) are encoded by the standard library.
+    """
+
+    def _orjson_option(self, kwargs: Dict[str, Any]) -> Optional[int]:
+        """Translate arguments of json.dumps to orjson options, return None if not supported by orjson."""
+        indent = kwargs.get("indent")
+        separators = kwargs.get("separators")
+        if set(kwargs) - {"indent", "separators"} or indent not in (None, 2):
+            return None
+
+        if separators is not None and separators != ((",", ": ") if indent else (",", ":")):
+            return None
+
+        if indent is None and separators is None:
+            # Default separators of json.dumps put spaces after separators, orjson output is always compact.
+            return None
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize data as JSON to a string."""
+        option = self._orjson_option(kwargs)
+        if option is not None and _orjson_exact(obj):
+            try:
+                encoded = orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                pass
+            else:
+                # The standard library escapes DEL as well when keeping output ASCII.
+                if not self.ensure_ascii or (encoded.isascii() and b"\x7f" not in encoded):
+                    return encoded.decode()
+
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Deserialize data as JSON from a string or bytes."""
+        if kwargs:
+            return super().loads(s, **kwargs)
+
+        if not _has_long_number(s):
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass
+
+        return super().loads(s)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Watching analyses until they finish, shared by all the requests served by one wsgi worker."""
+
+import logging
+import threading
+import time
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import Type
+
+from thoth.common import OpenShift
+from thoth.common.exceptions import NotFoundExceptionError as OpenShiftNotFound
+
+from .adapters import ADAPTERS
+
+_LOGGER = logging.getLogger(__name__)
+
+# States after which the analysis state does not change anymore.
+TERMINAL_STATES = frozenset(("ready", "failed", "error", "not_found"))
+
+
+class AnalysisWatcher:
+    """Watch analyses requested by clients using one background thread per wsgi worker.
+
+    On each tick, the workflow of each analysis watched is retrieved once, no matter how many clients wait for it,
+    results store is checked only for analyses whose workflow succeeded or is not present in the cluster. Clients
+    wait for a state change instead of polling the cluster and the results store on their own.
+
+    Waiting clients occupy a thread of the wsgi worker each, waiting pays off with threaded workers only (see
+    gunicorn.conf.py). Once max_clients clients wait, further clients are responded with the current state right away
+    so that threads are left for other requests - with max_clients set to 0, clients never wait.
+    """
+
+    def __init__(self, openshift: OpenShift, interval: float, max_clients: int) -> None:
+        """Initialize watcher checking watched analyses each interval seconds for at most max_clients clients."""
+        self.interval = interval
+        self.max_clients = max_clients
+        self._openshift = openshift
+        self._clients = 0
+        # Analysis id -> (namespace, results store adapter class, number of clients waiting).
+        self._watched: Dict[str, Tuple[str, Type[Any], int]] = {}
+        self._reports: Dict[str, Dict[str, Any]] = {}
+        self._condition = threading.Condition()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        """Get number of analyses watched."""
+        return len(self._watched)
+
+    def watch(
+        self,
+        analysis_id: str,
+        *,
+        namespace: str,
+        adapter_class: Type[Any],
+        known_state: Optional[str],
+        timeout: float,
+    ) -> Dict[str, Any]:
+        """Wait until state of the given analysis differs from the known one, return report of the current state.
+
+        The current report is returned once the timeout expires, even if the state did not change.
+        """
+        with self._condition:
+            overloaded = self._clients >= self.max_clients
+            if not overloaded:
+                self._clients += 1
+
+        if overloaded:
+            return self._check({analysis_id: (namespace, adapter_class)})[analysis_id]
+
+        try:
+            return self._wait(
+                analysis_id, namespace=namespace, adapter_class=adapter_class, known_state=known_state, timeout=timeout
+            )
+        finally:
+            with self._condition:
+                self._clients -= 1
+
+    def _wait(
+        self,
+        analysis_id: str,
+        *,
+        namespace: str,
+        adapter_class: Type[Any],
+        known_state: Optional[str],
+        timeout: float,
+    ) -> Dict[str, Any]:
+        """Wait for a state change of the given analysis checked by the background thread."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            _, _, waiting = self._watched.get(analysis_id, (namespace, adapter_class, 0))
+            self._watched[analysis_id] = (namespace, adapter_class, waiting + 1)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="analysis-watcher", daemon=True)
+                self._thread.start()
+            elif analysis_id not in self._reports:
+                self._wakeup.set()
+
+            try:
+                while True:
+                    report = self._reports.get(analysis_id)
+                    if report is not None and (report["state"] != known_state or report["state"] in TERMINAL_STATES):
+                        return dict(report)
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return dict(report) if report is not None else {"state": known_state, "status": None}
+
+                    self._condition.wait(remaining)
+            finally:
+                _, _, waiting = self._watched[analysis_id]
+                if waiting > 1:
+                    self._watched[analysis_id] = (namespace, adapter_class, waiting - 1)
+                else:
+                    del self._watched[analysis_id]
+                    self._reports.pop(analysis_id, None)
+
+    def _run(self) -> None:
+        """Check watched analyses until there are none."""
+        while True:
+            with self._condition:
+                if not self._watched:
+                    self._thread = None
+                    return
+
+                watched = {analysis_id: item[:2] for analysis_id, item in self._watched.items()}
+                # Do not check again analyses that reached a terminal state.
+                for analysis_id, report in self._reports.items():
+                    if report["state"] in TERMINAL_STATES:
+                        watched.pop(analysis_id, None)
+
+            try:
+                reports = self._check(watched)
+            except Exception:
+                _LOGGER.exception("Failed to check state of watched analyses")
+                reports = {}
+
+            with self._condition:
+                for analysis_id, report in reports.items():
+                    if analysis_id in self._watched:
+                        self._reports[analysis_id] = report
+                self._condition.notify_all()
+
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+    def _check(self, watched: Dict[str, Tuple[str, Type[Any]]]) -> Dict[str, Dict[str, Any]]:
+        """Check state of the given analyses."""
+        reports = {}
+        for analysis_id, (namespace, adapter_class) in watched.items():
+            status = None
+            try:
+                workflow = self._openshift.get_workflow(name=analysis_id, namespace=namespace)
+            except OpenShiftNotFound:
+                workflow = None
+
+            if workflow is not None:
+                workflow_status = workflow.get("status") or {}
+                status = {
+                    "finished_at": workflow_status.get("finishedAt"),
+                    "reason": None,
+                    "started_at": workflow_status.get("startedAt"),
+                    "state": workflow_status.get("phase", "pending").lower(),
+                }
+                if status["state"] != "succeeded":
+                    reports[analysis_id] = {"state": status["state"], "status": status}
+                    continue
+
+            adapter = ADAPTERS.get(adapter_class)
+            if adapter.document_exists(analysis_id):
+                reports[analysis_id] = {"state": "ready", "status": status}
+            elif status is not None:
+                # Workflow finished, the document is being stored.
+                reports[analysis_id] = {"state": "succeeded", "status": status}
+            elif adapter.request_exists(analysis_id):
+                reports[analysis_id] = {"state": "queued", "status": None}
+            else:
+                reports[analysis_id] = {"state": "not_found", "status": None}
+
+        return reports
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# thoth-user-api
+# Copyright(C) 2021 Fridolin Pokorny
+#
+# This program is free software: you can redistribute it and / or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Status reports of workflows run in the cluster, including bulk queries not provided by the OpenShift adapter."""
+
+import logging
+import threading
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from thoth.common import OpenShift
+from thoth.common.exceptions import NotFoundExceptionError as OpenShiftNotFound
+
+from .cache import TTLCache
+from .compat import workflow_status_report
+
+_LOGGER = logging.getLogger(__name__)
+
+# Label set by Argo on pods run as part of a workflow.
+_WORKFLOW_POD_LABEL = "workflows.argoproj.io/workflow"
+# Workflow states (as reported by OpenShift.get_workflow_status_report) and pod container states (as reported by
+# OpenShift.get_workflow_node_status) that do not change anymore.
+_WORKFLOW_TERMINAL_STATES = frozenset(("succeeded", "failed", "error"))
+_NODE_TERMINAL_STATES = frozenset(("terminated",))
+# Number of workflow names placed in one pod label selector to keep request URLs short.
+_POD_SELECTOR_CHUNK_SIZE = 50
+
+
+def _list_workflow_pods(openshift: OpenShift, workflow_ids: List[str], namespace: str) -> Dict[str, Dict[str, Any]]:
+    """List pods run by the given workflows, keyed by pod name."""
+    pods = {}
+    for idx in range(0, len(workflow_ids), _POD_SELECTOR_CHUNK_SIZE):
+        chunk = workflow_ids[idx : idx + _POD_SELECTOR_CHUNK_SIZE]
+        response = openshift.ocp_client.resources.get(api_version="v1", kind="Pod").get(
+            namespace=namespace,
+            label_selector=f"{_WORKFLOW_POD_LABEL} in ({','.join(chunk)})",
+        )
+        for item in response.to_dict()["items"]:
+            pods[item["metadata"]["name"]] = item
+
+    return pods
+
+
+def _pod_state(pod: Dict[str, Any]) -> Dict[str, Any]:
+    """Get state of the main container of a pod, the same way as OpenShift.get_pod_status does."""
+    if "containerStatuses" not in pod["status"]:
+        # No status - pod is being scheduled.
+        return {}
+
+    state: Dict[str, Any] = pod["status"]["containerStatuses"][0]["state"]
+    # Translate kills of liveness probes to our messages reported to user.
+    if state.get("terminated", {}).get("exitCode") == 137 and state["terminated"]["reason"] == "Error":
+        state["terminated"]["reason"] = "TimeoutKilled"
+
+    return state
+
+
+def _get_workflow(openshift: OpenShift, workflow_id: str, namespace: str) -> Optional[Dict[str, Any]]:
+    """Get workflow by its name, None if not found."""
+    try:
+        return openshift.get_workflow(name=workflow_id, namespace=namespace)
+    except OpenShiftNotFound:
+        return None
+
+
+class WorkflowStatusCache:
+    """Status reports of workflows and their nodes, cached in the memory of one wsgi worker.
+
+    Reports of workflows and nodes which finished are kept for a long time as they do not change anymore, reports of
+    workflows still in progress only for a short time. Workflows not found are not cached as they can be scheduled
+    any time.
+    """
+
+    # Number of cluster API calls done by each of the OpenShift methods wrapped.
+    _WORKFLOW_STATUS_CALLS = 1
+    _NODE_STATUS_CALLS = 2
+
+    def __init__(self, openshift: OpenShift, *, maxsize: int, ttl: float, terminal_ttl: float) -> None:
+        """Initialize cache keeping reports for the given time in seconds, depending on whether they are terminal."""
+        self.terminal_ttl = terminal_ttl
+        self.saved_calls = 0
+        self._openshift = openshift
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def _saved(self, calls: int) -> None:
+        """Record cluster API calls saved by serving a report from the cache."""
+        with self._lock:
+            self.saved_calls += calls
+
+    def get_workflow_status_report(self, workflow_id: str, namespace: str) -> Dict[str, Optional[str]]:
+        """Get workflow status report, see OpenShift.get_workflow_status_report."""
+        key = ("workflow", namespace, workflow_id)
+        status: Optional[Dict[str, Optional[str]]] = self._cache.get(key)
+        if status is not None:
+            self._saved(self._WORKFLOW_STATUS_CALLS)
+            return dict(status)
+
+        status = self._openshift.get_workflow_status_report(workflow_id, namespace=namespace)
+        ttl = self.terminal_ttl if status["state"] in _WORKFLOW_TERMINAL_STATES else None
+        self._cache.set(key, dict(status), ttl=ttl)
+        return status
+
+    def get_workflow_node_status(self, node_name: str, workflow_id: str, namespace: str) -> Dict[str, Any]:
+        """Get status report of a node in a workflow, see OpenShift.get_workflow_node_status."""
+        key = ("node", namespace, workflow_id, node_name)
+        status: Optional[Dict[str, Any]] = self._cache.get(key)
+        if status is not None:
+            self._saved(self._NODE_STATUS_CALLS)
+            return dict(status)
+
+        status = self._openshift.get_workflow_node_status(node_name, workflow_id, namespace)
+        ttl = self.terminal_ttl if status["state"] in _NODE_TERMINAL_STATES else None
+        self._cache.set(key, dict(status), ttl=ttl)
+        return status
+
+    def get_workflow_node_statuses(
+        self, node_name: str, workflow_ids: List[str], namespace: str
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get status reports of a node in each of the given workflows, workflows or nodes not found are None.
+
+        This is a bulk variant of get_workflow_node_status. Reports not cached are obtained by getting each of the
+        workflows by name and listing pods of all of them using label selectors, instead of two calls per workflow.
+        """
+        result: Dict[str, Optional[Dict[str, Any]]] = {}
+        missed: List[str] = []
+        for workflow_id in workflow_ids:
+            status: Optional[Dict[str, Any]] = self._cache.get(("node", namespace, workflow_id, node_name))
+            if status is not None:
+                self._saved(self._NODE_STATUS_CALLS)
+                result[workflow_id] = dict(status)
+            else:
+                missed.append(workflow_id)
+
+        pod_names: Dict[str, str] = {}
+        for workflow_id in missed:
+            workflow = _get_workflow(self._openshift, workflow_id, namespace) or {}
+            for pod_name, node_info in (workflow.get("status", {}).get("nodes") or {}).items():
+                if node_info["displayName"] == node_name:
+                    pod_names[workflow_id] = pod_name
+                    break
+
+        pods = _list_workflow_pods(self._openshift, list(pod_names), namespace) if pod_names else {}
+        for workflow_id in missed:
+            pod = pods.get(pod_names.get(workflow_id, ""))
+            if pod is None:
+                result[workflow_id] = None
+                continue
+
+            status = workflow_status_report(_pod_state(pod))
+            ttl = self.terminal_ttl if status["state"] in _NODE_TERMINAL_STATES else None
+            self._cache.set(("node", namespace, workflow_id, node_name), dict(status), ttl=ttl)
+            result[workflow_id] = status
+
+        return result